@@ -2,6 +2,27 @@ import pygame
 import random
 import os
 import sys
+import hashlib
+import bisect
+import struct
+import time
+import argparse
+import csv
+import json
+from collections import OrderedDict, deque
+
+# Command line options for recording and replaying runs
+parser = argparse.ArgumentParser(description="Jumping Frog Game")
+parser.add_argument("--record", metavar="FILE", help="record the seed and every input to FILE")
+parser.add_argument("--replay", metavar="FILE", help="replay FILE headless at unlimited speed")
+parser.add_argument("--seed", type=int, help="random seed (default: random)")
+parser.add_argument("--profile", metavar="FILE", help="write per-phase frame timings to FILE (.csv or .json) on exit")
+args = parser.parse_args()
+
+# Replays never open a real window
+if args.replay:
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
 
 pygame.init()
 
@@ -15,20 +36,126 @@ font = pygame.font.Font(None, 36)
 title_font = pygame.font.Font(None, 72)
 subtitle_font = pygame.font.Font(None, 48)
 
-# Asset path setup
-ASSET_DIR = '/Users/astha/Desktop/game for project/assets'
+# Asset path setup: assets/ next to this script unless FROG_ASSET_DIR is set
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+ASSET_DIR = os.environ.get("FROG_ASSET_DIR", os.path.join(BASE_DIR, "assets"))
+CACHE_DIR = os.environ.get(
+    "FROG_CACHE_DIR",
+    os.path.join(os.environ.get("XDG_CACHE_HOME", os.path.join(os.path.expanduser("~"), ".cache")),
+                 "gaming-hub")
+)
+
+# Every sprite the game blits: name -> (source file, width, height, flipped horizontally)
+SPRITES = {
+    "frog": ("frog.png", 40, 40, False),
+    "frog_jump": ("frog.png", 48, 48, False),
+    "frog_menu": ("frog.png", 80, 80, False),
+    "frog_pad": ("frog.png", 30, 30, False),
+    "frog_life": ("frog.png", 25, 25, False),
+    "car": ("car.png", 80, 40, False),
+    "car_flipped": ("car.png", 80, 40, True),
+    "truck": ("truck.png", 120, 40, False),
+    "truck_flipped": ("truck.png", 120, 40, True),
+    "log": ("log.png", 160, 40, False),
+    "log_flipped": ("log.png", 160, 40, True),
+    "lilypad": ("lilypad.png", 60, 60, False),
+}
+ATLAS_WIDTH = 256
+
+# Loads every sprite pre-scaled into a single atlas surface, cached on disk
+class AssetManager:
+    def __init__(self, asset_dir, cache_dir, sprites):
+        self.asset_dir = asset_dir
+        self.cache_dir = cache_dir
+        self.sprites = sprites
+        self.rects, self.atlas_size = self.pack()
+        self.atlas = self.load_atlas()
+        self.images = {name: self.atlas.subsurface(rect) for name, rect in self.rects.items()}
+        # Map each sprite to its pre-flipped twin so obstacles never flip at spawn time
+        self.flips = {}
+        for name in self.images:
+            if name + "_flipped" in self.images:
+                self.flips[self.images[name]] = self.images[name + "_flipped"]
+
+    def get(self, name):
+        return self.images[name]
+
+    def flipped(self, image):
+        flipped_img = self.flips.get(image)
+        if flipped_img is None:
+            flipped_img = pygame.transform.flip(image, True, False)
+            self.flips[image] = flipped_img
+        return flipped_img
+
+    def pack(self):
+        # Simple shelf packing, tallest sprites first, so the layout is deterministic
+        rects = {}
+        x = y = shelf_height = 0
+        order = sorted(self.sprites, key=lambda n: (-self.sprites[n][2], -self.sprites[n][1], n))
+        for name in order:
+            _, width, height, _ = self.sprites[name]
+            if x + width > ATLAS_WIDTH:
+                x = 0
+                y += shelf_height
+                shelf_height = 0
+            rects[name] = pygame.Rect(x, y, width, height)
+            x += width
+            shelf_height = max(shelf_height, height)
+        return rects, (ATLAS_WIDTH, y + shelf_height)
+
+    def cache_path(self):
+        # Key on the sprite table and the source files' size/mtime, without reading them
+        key = hashlib.sha1(repr(sorted(self.sprites.items())).encode())
+        for filename in sorted({spec[0] for spec in self.sprites.values()}):
+            stat = os.stat(os.path.join(self.asset_dir, filename))
+            key.update(f"{filename}:{stat.st_size}:{stat.st_mtime_ns}".encode())
+        return os.path.join(self.cache_dir, f"frog_atlas_{key.hexdigest()[:16]}.png")
+
+    def load_atlas(self):
+        path = self.cache_path()
+        if os.path.exists(path):
+            try:
+                atlas = pygame.image.load(path)
+                if atlas.get_size() == self.atlas_size:
+                    return atlas.convert_alpha()
+            except pygame.error:
+                pass
+        atlas = self.build_atlas()
+        try:
+            os.makedirs(self.cache_dir, exist_ok=True)
+            tmp_path = path + ".tmp.png"
+            pygame.image.save(atlas, tmp_path)
+            os.replace(tmp_path, path)
+        except (OSError, pygame.error):
+            # A read-only cache dir only costs us the rebuild next time
+            pass
+        return atlas
 
-# Load and scale images
-def load_and_scale(image_path, width, height):
-    img = pygame.image.load(os.path.join(ASSET_DIR, image_path))
-    return pygame.transform.scale(img, (width, height))
+    def build_atlas(self):
+        atlas = pygame.Surface(self.atlas_size, pygame.SRCALPHA).convert_alpha()
+        atlas.fill((0, 0, 0, 0))
+        sources = {}
+        for name, (filename, width, height, flip) in self.sprites.items():
+            if filename not in sources:
+                img = pygame.image.load(os.path.join(self.asset_dir, filename))
+                sources[filename] = img.convert_alpha() if img.get_alpha() is not None else img.convert()
+            img = pygame.transform.scale(sources[filename], (width, height))
+            if flip:
+                img = pygame.transform.flip(img, True, False)
+            atlas.blit(img, self.rects[name])
+        return atlas
 
-# Scale images appropriately for the game
-frog_img = load_and_scale("frog.png", 40, 40)
-car_img = load_and_scale("car.png", 80, 40)
-truck_img = load_and_scale("truck.png", 120, 40)
-log_img = load_and_scale("log.png", 160, 40)
-lilypad_img = load_and_scale("lilypad.png", 60, 60)
+assets = AssetManager(ASSET_DIR, CACHE_DIR, SPRITES)
+
+frog_img = assets.get("frog")
+car_img = assets.get("car")
+truck_img = assets.get("truck")
+log_img = assets.get("log")
+lilypad_img = assets.get("lilypad")
+frog_jump_img = assets.get("frog_jump")
+frog_menu_img = assets.get("frog_menu")
+frog_pad_img = assets.get("frog_pad")
+frog_life_img = assets.get("frog_life")
 
 # Constants for game grid
 GRID_SIZE = 50  # Size of each grid cell
@@ -52,6 +179,26 @@ WHITE = (255, 255, 255)
 RED = (255, 0, 0)
 YELLOW = (255, 255, 0)
 
+# LRU cache of rendered text surfaces keyed by (font, text, color)
+class TextCache:
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self.surfaces[key] = surf
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surf
+
+text_cache = TextCache()
+
 # Button class for menu
 class Button:
     def __init__(self, x, y, width, height, text, color, hover_color):
@@ -60,7 +207,7 @@ class Button:
         self.color = color
         self.hover_color = hover_color
         self.current_color = color
-        self.text_surf = font.render(text, True, BLACK)
+        self.text_surf = text_cache.render(font, text, BLACK)
         self.text_rect = self.text_surf.get_rect(center=self.rect.center)
         
     def draw(self):
@@ -87,6 +234,12 @@ class Frog:
         self.jump_animation = False
         self.original_img = frog_img
         self.image = self.original_img
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
+
+    def get_rect(self):
+        # Refresh the persistent rect in place instead of building a new one
+        self.rect.update(self.x, self.y, self.width, self.height)
+        return self.rect
 
     def draw(self):
         # Simple jump animation
@@ -95,11 +248,7 @@ class Frog:
             if self.animation_timer <= 5:
                 # Scale up slightly during jump
                 scale = 1.2
-                jump_img = pygame.transform.scale(
-                    self.original_img, 
-                    (int(self.width * scale), int(self.height * scale))
-                )
-                screen.blit(jump_img, (self.x - (self.width * (scale-1))/2, self.y - (self.height * (scale-1))/2))
+                screen.blit(frog_jump_img, (self.x - (self.width * (scale-1))/2, self.y - (self.height * (scale-1))/2))
             else:
                 screen.blit(self.image, (self.x, self.y))
                 
@@ -140,24 +289,36 @@ class Obstacle:
         self.y = y
         self.speed = speed
         self.original_img = image
-        # Flip image if moving left
+        # Use the pre-flipped sprite if moving left
         if speed < 0:
-            self.image = pygame.transform.flip(image, True, False)
+            self.image = assets.flipped(image)
         else:
             self.image = image
         self.width = self.image.get_width()
         self.height = self.image.get_height()
+        self.rect = pygame.Rect(self.x, self.y, self.width, self.height)
 
     def draw(self):
         screen.blit(self.image, (self.x, self.y))
 
     def move(self):
         self.x += self.speed
+        self.rect.x = self.x
         # Check if off screen
         if (self.speed > 0 and self.x > WIDTH) or (self.speed < 0 and self.x + self.width < 0):
             return False
         return True
 
+# Scaled lily pad images keyed by size, shared by all pads while pulsing
+pulse_cache = {}
+
+def get_pulse_img(width, height):
+    img = pulse_cache.get((width, height))
+    if img is None:
+        img = pygame.transform.scale(lilypad_img, (width, height))
+        pulse_cache[(width, height)] = img
+    return img
+
 # Lily pad class
 class LilyPad:
     def __init__(self, x, y):
@@ -165,6 +326,7 @@ class LilyPad:
         self.y = y
         self.width = lilypad_img.get_width()
         self.height = lilypad_img.get_height()
+        self.rect = pygame.Rect(x, y, self.width, self.height)
         self.occupied = False
         self.pulse_timer = 0
         self.pulse_direction = 1
@@ -188,17 +350,14 @@ class LilyPad:
                 self.pulse_direction = 1
                 
             # Draw with scale
-            scaled_img = pygame.transform.scale(
-                lilypad_img, 
-                (int(self.width * self.pulse_scale), int(self.height * self.pulse_scale))
-            )
+            scaled_img = get_pulse_img(int(self.width * self.pulse_scale), 
+                                       int(self.height * self.pulse_scale))
             screen.blit(scaled_img, 
                        (self.x - (scaled_img.get_width() - self.width)/2, 
                         self.y - (scaled_img.get_height() - self.height)/2))
             
             # Draw a frog on top to show it's occupied
-            small_frog = pygame.transform.scale(frog_img, (30, 30))
-            screen.blit(small_frog, (self.x + 15, self.y + 15))
+            screen.blit(frog_pad_img, (self.x + 15, self.y + 15))
         else:
             screen.blit(lilypad_img, (self.x, self.y))
 
@@ -217,19 +376,94 @@ middle_grass_start = road_start - MIDDLE_GRASS_HEIGHT
 river_start = middle_grass_start - RIVER_HEIGHT
 lily_pad_start = river_start - TOP_MARGIN
 
+def rect_x(item):
+    return item.rect.x
+
+# Find the items overlapping rect among items sorted by x that all share one width
+def overlapping(items, rect):
+    hits = []
+    # Everything from here on starts at or past the right edge of rect
+    i = bisect.bisect_left(items, rect.right, key=rect_x)
+    while i > 0:
+        i -= 1
+        item = items[i]
+        # Equal widths mean right edges are sorted too, so nothing further left can reach
+        if item.rect.right <= rect.left:
+            break
+        if item.rect.colliderect(rect):
+            hits.append(item)
+    return hits
+
+# Lane of obstacles that all travel at one speed, kept sorted by x
+class Lane:
+    def __init__(self, y, speed, image, frequency):
+        self.y = y
+        self.speed = speed
+        self.image = image
+        self.frequency = frequency
+        self.timer = 0
+        self.obstacles = []
+
+    def reset(self):
+        self.obstacles = []
+
+    def update(self, speed_modifier=1):
+        self.timer += 1
+        if self.timer >= self.frequency:
+            if len(self.obstacles) < 2:  # LIMIT TO 2 OBSTACLES PER LANE
+                self.timer = 0
+                if self.speed > 0:
+                    # Entering from the left keeps the lane sorted by x
+                    self.obstacles.insert(0, Obstacle(-self.image.get_width(), self.y,
+                                                      self.speed * speed_modifier, self.image))
+                else:
+                    self.obstacles.append(Obstacle(WIDTH, self.y, self.speed * speed_modifier, self.image))
+
+        # Everything moves by the same amount, so the order never changes
+        self.obstacles = [obstacle for obstacle in self.obstacles if obstacle.move()]
+
+    def draw(self):
+        for obstacle in self.obstacles:
+            obstacle.draw()
+
+    def hits(self, rect):
+        return overlapping(self.obstacles, rect)
+
 # Set up lanes and objects with proper spacing
 vehicle_lanes = [
-    {"y": grass_start - GRID_SIZE, "speed": 2, "image": car_img, "frequency": 120},
-    {"y": grass_start - GRID_SIZE*2, "speed": -3, "image": truck_img, "frequency": 150},
-    {"y": grass_start - GRID_SIZE*3, "speed": 2.5, "image": car_img, "frequency": 130},
+    Lane(grass_start - GRID_SIZE, 2, car_img, 120),
+    Lane(grass_start - GRID_SIZE*2, -3, truck_img, 150),
+    Lane(grass_start - GRID_SIZE*3, 2.5, car_img, 130),
 ]
 
 log_lanes = [
-    {"y": middle_grass_start - GRID_SIZE, "speed": -1.5, "image": log_img, "frequency": 160},
-    {"y": middle_grass_start - GRID_SIZE*2, "speed": 2, "image": log_img, "frequency": 170},
-    {"y": middle_grass_start - GRID_SIZE*3, "speed": -1.8, "image": log_img, "frequency": 180},
+    Lane(middle_grass_start - GRID_SIZE, -1.5, log_img, 160),
+    Lane(middle_grass_start - GRID_SIZE*2, 2, log_img, 170),
+    Lane(middle_grass_start - GRID_SIZE*3, -1.8, log_img, 180),
 ]
 
+# Broadphase: grid rows -> the lanes occupying them
+def grid_rows(y, height):
+    return range(int(y) // GRID_SIZE, (int(y) + height - 1) // GRID_SIZE + 1)
+
+def build_row_index(lanes):
+    index = {}
+    for lane in lanes:
+        for row in grid_rows(lane.y, lane.image.get_height()):
+            index.setdefault(row, []).append(lane)
+    return index
+
+def lanes_at(index, rect):
+    found = []
+    for row in grid_rows(rect.y, rect.height):
+        for lane in index.get(row, ()):
+            if lane not in found:
+                found.append(lane)
+    return found
+
+vehicle_rows = build_row_index(vehicle_lanes)
+log_rows = build_row_index(log_lanes)
+
 # Particle class for visual effects
 class Particle:
     def __init__(self, x, y, color, size=5, vel_x=0, vel_y=0, life=30):
@@ -259,14 +493,11 @@ class Particle:
 
 # Create lily pads in the water area
 lily_pads_y = middle_grass_start - GRID_SIZE*4  # Position lily pads at the top of river
-lilypads = [LilyPad(100 + i*200, lily_pads_y) for i in range(5)]
+lilypads = [LilyPad(100 + i*200, lily_pads_y) for i in range(5)]  # sorted by x
+lily_pad_rows = set(grid_rows(lily_pads_y, lilypad_img.get_height()))
 
 # Initialize game variables
-vehicles = []
-logs = []
 particles = []
-vehicle_timers = [0 for _ in vehicle_lanes]
-log_timers = [0 for _ in log_lanes]
 
 frog = Frog()
 
@@ -277,6 +508,14 @@ game_state = MENU
 message_timer = 0
 level_complete_timer = 0
 
+# Persistent semi-transparent overlays for the GAME_OVER and LEVEL_COMPLETE screens
+game_over_overlay = pygame.Surface((WIDTH, HEIGHT))
+game_over_overlay.fill(BLACK)
+game_over_overlay.set_alpha(180)
+level_complete_overlay = pygame.Surface((WIDTH, HEIGHT))
+level_complete_overlay.fill(BLACK)
+level_complete_overlay.set_alpha(120)
+
 # Menu buttons
 play_button = Button(WIDTH//2 - 100, HEIGHT//2, 200, 60, "PLAY", GREEN, YELLOW)
 quit_button = Button(WIDTH//2 - 100, HEIGHT//2 + 100, 200, 60, "QUIT", RED, YELLOW)
@@ -318,31 +557,34 @@ def draw_game_areas():
     for i in range(0, WIDTH, 30):
         pygame.draw.rect(screen, DARK_GREEN, (i, lily_pad_start + 10, 15, 15))
 
+# Gameplay randomness comes from one seeded generator so runs can be replayed
+rng = random.Random()
+
 # Create water splash effect
 def create_water_splash(x, y):
     for _ in range(20):
-        vel_x = random.uniform(-2, 2)
-        vel_y = random.uniform(-4, -1)
-        size = random.uniform(3, 6)
+        vel_x = rng.uniform(-2, 2)
+        vel_y = rng.uniform(-4, -1)
+        size = rng.uniform(3, 6)
         particles.append(Particle(x, y, BLUE, size, vel_x, vel_y, 40))
 
 # Create confetti effect for level completion
 def create_confetti():
     for _ in range(50):
-        x = random.randint(0, WIDTH)
-        y = random.randint(0, HEIGHT//3)
-        vel_x = random.uniform(-1, 1)
-        vel_y = random.uniform(1, 3)
-        size = random.uniform(5, 10)
-        color = random.choice([GREEN, YELLOW, RED, (255, 0, 255), (0, 255, 255)])
+        x = rng.randint(0, WIDTH)
+        y = rng.randint(0, HEIGHT//3)
+        vel_x = rng.uniform(-1, 1)
+        vel_y = rng.uniform(1, 3)
+        size = rng.uniform(5, 10)
+        color = rng.choice([GREEN, YELLOW, RED, (255, 0, 255), (0, 255, 255)])
         particles.append(Particle(x, y, color, size, vel_x, vel_y, 120))
 
 # Reset the game
 def reset_game():
-    global frog, vehicles, logs, score, level, particles
+    global frog, score, level, particles
     frog = Frog()
-    vehicles = []
-    logs = []
+    for lane in vehicle_lanes + log_lanes:
+        lane.reset()
     particles = []
     for pad in lilypads:
         pad.occupied = False
@@ -358,27 +600,244 @@ def update_particles():
         else:
             particle.draw()
 
+# Frame phases timed by the profiler, in the order they run
+PROFILE_PHASES = ["events", "draw_game_areas", "vehicles", "logs", "lily_pads",
+                  "particles", "hud", "flip", "other"]
+PROFILE_WINDOW = 600  # frames kept for the rolling percentiles
+PROFILE_REFRESH = 30  # frames between overlay refreshes
+
+# Splits every frame into phases and keeps rolling timings for each of them
+class FrameProfiler:
+    def __init__(self, phases, window=PROFILE_WINDOW):
+        self.phases = phases
+        self.samples = {phase: deque(maxlen=window) for phase in phases + ["frame"]}
+        self.current = dict.fromkeys(phases, 0.0)
+        self.frame_start = self.mark = time.perf_counter()
+        self.frames = 0
+        self.visible = False
+        self.lines = []
+
+    def begin_frame(self):
+        for phase in self.phases:
+            self.current[phase] = 0.0
+        self.frame_start = self.mark = time.perf_counter()
+
+    def lap(self, phase):
+        # Charge the time since the previous lap to this phase
+        now = time.perf_counter()
+        self.current[phase] += now - self.mark
+        self.mark = now
+
+    def end_frame(self):
+        self.lap("other")
+        for phase in self.phases:
+            self.samples[phase].append(self.current[phase])
+        self.samples["frame"].append(self.mark - self.frame_start)
+        self.frames += 1
+        if self.visible and self.frames % PROFILE_REFRESH == 0:
+            self.refresh_lines()
+
+    def percentiles(self, phase):
+        values = sorted(self.samples[phase])
+        if not values:
+            return 0.0, 0.0, 0.0
+        last = len(values) - 1
+        return tuple(values[round(last * q)] * 1000 for q in (0.50, 0.95, 0.99))
+
+    def summary(self):
+        stats = {}
+        for phase in self.phases + ["frame"]:
+            values = self.samples[phase]
+            p50, p95, p99 = self.percentiles(phase)
+            stats[phase] = {
+                "samples": len(values),
+                "mean_ms": sum(values) * 1000 / len(values) if values else 0.0,
+                "p50_ms": p50,
+                "p95_ms": p95,
+                "p99_ms": p99,
+                "max_ms": max(values) * 1000 if values else 0.0,
+            }
+        return stats
+
+    def toggle(self):
+        self.visible = not self.visible
+        if self.visible:
+            self.refresh_lines()
+
+    def refresh_lines(self):
+        # Text only changes every PROFILE_REFRESH frames so the text cache is not flooded
+        self.lines = [f"{'phase':<16}{'p50':>7}{'p95':>7}{'p99':>7}"]
+        for phase in self.phases + ["frame"]:
+            p50, p95, p99 = self.percentiles(phase)
+            self.lines.append(f"{phase:<16}{p50:7.2f}{p95:7.2f}{p99:7.2f}")
+
+    def draw(self):
+        if not self.visible:
+            return
+        width = 300
+        height = 10 + 20 * len(self.lines)
+        x = WIDTH - width - 5
+        pygame.draw.rect(screen, BLACK, (x, 5, width, height))
+        pygame.draw.rect(screen, YELLOW, (x, 5, width, height), 1)
+        for i, line in enumerate(self.lines):
+            screen.blit(text_cache.render(profile_font, line, YELLOW), (x + 8, 10 + i * 20))
+
+    def export(self, path):
+        stats = self.summary()
+        with open(path, "w", newline="") as f:
+            if path.lower().endswith(".json"):
+                json.dump(stats, f, indent=2)
+            else:
+                writer = csv.writer(f)
+                columns = ["samples", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+                writer.writerow(["phase"] + columns)
+                for phase, row in stats.items():
+                    writer.writerow([phase] + [round(row[c], 4) if c != "samples" else row[c] for c in columns])
+
+profile_font = pygame.font.SysFont("monospace", 16)
+profiler = FrameProfiler(PROFILE_PHASES)
+
+# Input log format: header, then per event a varint tick delta, a kind byte and its payload
+REPLAY_MAGIC = b"FROG"
+REPLAY_VERSION = 1
+REPLAY_HEADER = struct.Struct("<4sBQ")
+EVENT_QUIT = 0
+EVENT_KEYDOWN = 1
+EVENT_MOUSEBUTTONDOWN = 2
+
+def write_varint(out, value):
+    while value >= 0x80:
+        out.append((value & 0x7F) | 0x80)
+        value >>= 7
+    out.append(value)
+
+def read_varint(data, pos):
+    value = shift = 0
+    while True:
+        byte = data[pos]
+        pos += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, pos
+        shift += 7
+
+# Writes the seed and every gameplay-relevant input event, tagged with its tick
+class InputRecorder:
+    def __init__(self, path, seed):
+        self.file = open(path, "wb")
+        self.file.write(REPLAY_HEADER.pack(REPLAY_MAGIC, REPLAY_VERSION, seed))
+        self.last_tick = 0
+
+    def record(self, tick, events):
+        out = bytearray()
+        for event in events:
+            if event.type == pygame.QUIT:
+                kind, payload = EVENT_QUIT, ()
+            elif event.type == pygame.KEYDOWN:
+                kind, payload = EVENT_KEYDOWN, (event.key,)
+            elif event.type == pygame.MOUSEBUTTONDOWN:
+                kind, payload = EVENT_MOUSEBUTTONDOWN, (event.button, event.pos[0], event.pos[1])
+            else:
+                continue
+            write_varint(out, tick - self.last_tick)
+            out.append(kind)
+            for value in payload:
+                write_varint(out, value)
+            self.last_tick = tick
+        if out:
+            self.file.write(out)
+
+    def close(self):
+        self.file.close()
+
+# Reads an input log back and hands out the events recorded for each tick
+class InputReplayer:
+    def __init__(self, path):
+        with open(path, "rb") as f:
+            data = f.read()
+        magic, version, self.seed = REPLAY_HEADER.unpack_from(data)
+        if magic != REPLAY_MAGIC or version != REPLAY_VERSION:
+            raise ValueError(f"{path} is not a version {REPLAY_VERSION} frog replay")
+        self.events = {}
+        self.last_tick = tick = 0
+        pos = REPLAY_HEADER.size
+        while pos < len(data):
+            delta, pos = read_varint(data, pos)
+            kind = data[pos]
+            pos += 1
+            tick += delta
+            if kind == EVENT_QUIT:
+                event = pygame.event.Event(pygame.QUIT)
+            elif kind == EVENT_KEYDOWN:
+                key, pos = read_varint(data, pos)
+                event = pygame.event.Event(pygame.KEYDOWN, key=key)
+            elif kind == EVENT_MOUSEBUTTONDOWN:
+                button, pos = read_varint(data, pos)
+                x, pos = read_varint(data, pos)
+                y, pos = read_varint(data, pos)
+                event = pygame.event.Event(pygame.MOUSEBUTTONDOWN, button=button, pos=(x, y))
+            else:
+                raise ValueError(f"Unknown event kind {kind} in {path}")
+            self.events.setdefault(tick, []).append(event)
+            self.last_tick = tick
+
+    def events_for(self, tick):
+        return self.events.get(tick, [])
+
+    def finished(self, tick):
+        return tick > self.last_tick
+
+recorder = None
+replayer = None
+if args.replay:
+    replayer = InputReplayer(args.replay)
+    seed = replayer.seed
+elif args.seed is not None:
+    seed = args.seed
+else:
+    seed = random.randrange(2**32)
+if args.record:
+    recorder = InputRecorder(args.record, seed)
+rng.seed(seed)
+
 # Main game loop
 running = True
+tick = 0
+replay_start = time.perf_counter()
 while running:
-    clock.tick(60)
+    # Replays run as fast as the simulation allows
+    if replayer is None:
+        clock.tick(60)
+    profiler.begin_frame()
     mouse_pos = pygame.mouse.get_pos()
     
-    # Handle events
-    for event in pygame.event.get():
+    # Handle events, from the replay log if there is one
+    if replayer is not None:
+        if replayer.finished(tick):
+            break
+        events = replayer.events_for(tick)
+    else:
+        events = pygame.event.get()
+        if recorder is not None:
+            recorder.record(tick, events)
+    tick += 1
+    for event in events:
         if event.type == pygame.QUIT:
             running = False
             
         elif event.type == pygame.MOUSEBUTTONDOWN:
             if game_state == MENU:
-                if play_button.check_hover(mouse_pos):
+                if play_button.check_hover(event.pos):
                     game_state = PLAYING
                     reset_game()
-                elif quit_button.check_hover(mouse_pos):
+                elif quit_button.check_hover(event.pos):
                     running = False
                     
         elif event.type == pygame.KEYDOWN:
-            if game_state == PLAYING:
+            # F3 toggles the frame-time profiler overlay in any state
+            if event.key == pygame.K_F3:
+                profiler.toggle()
+            elif game_state == PLAYING:
                 if event.key == pygame.K_LEFT and frog.x > 0:
                     frog.move(-GRID_SIZE, 0)
                 elif event.key == pygame.K_RIGHT and frog.x + frog.width < WIDTH:
@@ -400,6 +859,8 @@ while running:
                 elif event.key == pygame.K_ESCAPE:
                     running = False
     
+    profiler.lap("events")
+    
     # Clear screen
     screen.fill((20, 100, 20))
     
@@ -412,27 +873,27 @@ while running:
                     pygame.draw.rect(screen, DARK_GREEN, (i, j, 25, 25))
         
         # Draw title
-        title_text = title_font.render("JUMPING FROG", True, YELLOW)
-        shadow_text = title_font.render("JUMPING FROG", True, BLACK)
+        title_text = text_cache.render(title_font, "JUMPING FROG", YELLOW)
+        shadow_text = text_cache.render(title_font, "JUMPING FROG", BLACK)
         title_rect = title_text.get_rect(center=(WIDTH//2, HEIGHT//4))
         screen.blit(shadow_text, (title_rect.x + 4, title_rect.y + 4))
         screen.blit(title_text, title_rect)
         
         # Draw subtitle
-        subtitle_text = subtitle_font.render("ADVENTURE", True, WHITE)
+        subtitle_text = text_cache.render(subtitle_font, "ADVENTURE", WHITE)
         sub_rect = subtitle_text.get_rect(center=(WIDTH//2, HEIGHT//4 + 70))
         screen.blit(subtitle_text, sub_rect)
         
         # Draw instructions
-        inst_text1 = font.render("Use arrow keys to move", True, WHITE)
-        inst_text2 = font.render("Cross the road and river to reach the lily pads", True, WHITE)
-        inst_text3 = font.render("Fill all lily pads to advance to the next level", True, WHITE)
+        inst_text1 = text_cache.render(font, "Use arrow keys to move", WHITE)
+        inst_text2 = text_cache.render(font, "Cross the road and river to reach the lily pads", WHITE)
+        inst_text3 = text_cache.render(font, "Fill all lily pads to advance to the next level", WHITE)
         screen.blit(inst_text1, (WIDTH//2 - inst_text1.get_width()//2, HEIGHT//2 - 100))
         screen.blit(inst_text2, (WIDTH//2 - inst_text2.get_width()//2, HEIGHT//2 - 60))
         screen.blit(inst_text3, (WIDTH//2 - inst_text3.get_width()//2, HEIGHT//2 - 20))
         
         # Draw high score
-        high_score_text = font.render(f"High Score: {high_score}", True, YELLOW)
+        high_score_text = text_cache.render(font, f"High Score: {high_score}", YELLOW)
         screen.blit(high_score_text, (WIDTH//2 - high_score_text.get_width()//2, HEIGHT - 100))
         
         # Update button hover states
@@ -444,81 +905,53 @@ while running:
         quit_button.draw()
         
         # Draw a decorative frog
-        big_frog = pygame.transform.scale(frog_img, (80, 80))
-        screen.blit(big_frog, (WIDTH//2 - 40, HEIGHT//4 - 120))
+        screen.blit(frog_menu_img, (WIDTH//2 - 40, HEIGHT//4 - 120))
         
     elif game_state == PLAYING:
         # Draw game zones
         draw_game_areas()
+        profiler.lap("draw_game_areas")
         
         # Update and draw vehicles
-        for i, lane in enumerate(vehicle_lanes):
-            vehicle_timers[i] += 1
-            if vehicle_timers[i] >= lane["frequency"]:
-                if sum(1 for v in vehicles if v.y == lane["y"]) < 2:  # LIMIT TO 2 VEHICLES PER LANE
-                    vehicle_timers[i] = 0
-                    start_x = -lane["image"].get_width() if lane["speed"] > 0 else WIDTH
-                    speed_modifier = 1 + (level - 1) * 0.1  # Reduced speed scaling
-                    vehicles.append(Obstacle(
-                        start_x, 
-                        lane["y"], 
-                        lane["speed"] * speed_modifier, 
-                        lane["image"]
-                    ))
-
-        # Update vehicles and check collisions
-        for vehicle in vehicles[:]:
-            if not vehicle.move():
-                vehicles.remove(vehicle)
-            else:
-                vehicle.draw()
-                
-                # Collision detection
-                frog_rect = pygame.Rect(frog.x, frog.y, frog.width, frog.height)
-                vehicle_rect = pygame.Rect(vehicle.x, vehicle.y, vehicle.width, vehicle.height)
-                if frog_rect.colliderect(vehicle_rect):
-                    if not frog.lose_life():
-                        game_state = GAME_OVER
-                        if score > high_score:
-                            high_score = score
-                    else:
-                        # Create crash particles
-                        for _ in range(20):
-                            vel_x = random.uniform(-2, 2)
-                            vel_y = random.uniform(-2, 2)
-                            size = random.uniform(3, 6)
-                            particles.append(Particle(frog.x + frog.width//2, frog.y + frog.height//2, 
-                                                    RED, size, vel_x, vel_y, 30))
+        speed_modifier = 1 + (level - 1) * 0.1  # Reduced speed scaling
+        for lane in vehicle_lanes:
+            lane.update(speed_modifier)
+            lane.draw()
+
+        # Check collisions only against vehicles in the frog's rows
+        for lane in lanes_at(vehicle_rows, frog.get_rect()):
+            if lane.hits(frog.get_rect()):
+                if not frog.lose_life():
+                    game_state = GAME_OVER
+                    if score > high_score:
+                        high_score = score
+                else:
+                    # Create crash particles
+                    for _ in range(20):
+                        vel_x = rng.uniform(-2, 2)
+                        vel_y = rng.uniform(-2, 2)
+                        size = rng.uniform(3, 6)
+                        particles.append(Particle(frog.x + frog.width//2, frog.y + frog.height//2, 
+                                                RED, size, vel_x, vel_y, 30))
+        profiler.lap("vehicles")
 
         # Update and draw logs
-        for i, lane in enumerate(log_lanes):
-            log_timers[i] += 1
-            if log_timers[i] >= lane["frequency"]:
-                if sum(1 for l in logs if l.y == lane["y"]) < 2:  # LIMIT TO 2 LOGS PER LANE
-                    log_timers[i] = 0
-                    start_x = -lane["image"].get_width() if lane["speed"] > 0 else WIDTH
-                    logs.append(Obstacle(start_x, lane["y"], lane["speed"], lane["image"]))
+        for lane in log_lanes:
+            lane.update()
+            lane.draw()
 
         # Handle log interactions
         on_log = False
-        for log in logs[:]:
-            if not log.move():
-                logs.remove(log)
-            else:
-                log.draw()
-
-                # Log collision
-                frog_rect = pygame.Rect(frog.x, frog.y, frog.width, frog.height)
-                log_rect = pygame.Rect(log.x, log.y, log.width, log.height)
-                if frog_rect.colliderect(log_rect):
-                    frog.x += log.speed
-                    on_log = True
-                    
-                    # Keep frog within bounds while on log
-                    if frog.x < 0:
-                        frog.x = 0
-                    elif frog.x > WIDTH - frog.width:
-                        frog.x = WIDTH - frog.width
+        for lane in lanes_at(log_rows, frog.get_rect()):
+            for log in lane.hits(frog.get_rect()):
+                frog.x += log.speed
+                on_log = True
+                
+                # Keep frog within bounds while on log
+                if frog.x < 0:
+                    frog.x = 0
+                elif frog.x > WIDTH - frog.width:
+                    frog.x = WIDTH - frog.width
 
         # Check if frog is in water without a log
         if river_start < frog.y < middle_grass_start and not on_log:
@@ -529,20 +962,22 @@ while running:
                 game_state = GAME_OVER
                 if score > high_score:
                     high_score = score
+        profiler.lap("logs")
         
-        # Check lily pad collisions
-        frog_rect = pygame.Rect(frog.x, frog.y, frog.width, frog.height)
-        for pad in lilypads:
-            pad_rect = pygame.Rect(pad.x, pad.y, pad.width, pad.height)
-            if frog_rect.colliderect(pad_rect) and not pad.occupied:
+        # Check lily pad collisions, only when the frog is in the lily pad rows
+        frog_rect = frog.get_rect()
+        if lily_pad_rows.intersection(grid_rows(frog_rect.y, frog_rect.height)):
+            for pad in overlapping(lilypads, frog_rect):
+                if pad.occupied:
+                    continue
                 pad.occupied = True
                 frog.reset_position()
                 score += 100
                 # Create success particles
                 for _ in range(20):
-                    vel_x = random.uniform(-2, 2)
-                    vel_y = random.uniform(-2, 2)
-                    size = random.uniform(3, 6)
+                    vel_x = rng.uniform(-2, 2)
+                    vel_y = rng.uniform(-2, 2)
+                    size = rng.uniform(3, 6)
                     particles.append(Particle(pad.x + pad.width//2, pad.y + pad.height//2, 
                                             YELLOW, size, vel_x, vel_y, 40))
                 
@@ -552,13 +987,16 @@ while running:
                     game_state = LEVEL_COMPLETE
                     level_complete_timer = 180  # 3 seconds
                     create_confetti()
+                break
 
         # Draw lily pads
         for pad in lilypads:
             pad.draw()
+        profiler.lap("lily_pads")
             
         # Update and draw particles
         update_particles()
+        profiler.lap("particles")
             
         # Draw frog last so it appears on top
         frog.draw()
@@ -566,77 +1004,85 @@ while running:
     elif game_state == GAME_OVER:
         # Keep drawing the game state in the background
         draw_game_areas()
-        for vehicle in vehicles:
-            vehicle.draw()
-        for log in logs:
-            log.draw()
+        profiler.lap("draw_game_areas")
+        for lane in vehicle_lanes:
+            lane.draw()
+        profiler.lap("vehicles")
+        for lane in log_lanes:
+            lane.draw()
+        profiler.lap("logs")
         for pad in lilypads:
             pad.draw()
+        profiler.lap("lily_pads")
         
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 180))
-        screen.blit(overlay, (0, 0))
+        screen.blit(game_over_overlay, (0, 0))
         
         # Game Over Message
-        game_over_text = title_font.render("GAME OVER", True, RED)
+        game_over_text = text_cache.render(title_font, "GAME OVER", RED)
         text_rect = game_over_text.get_rect(center=(WIDTH//2, HEIGHT//3))
         screen.blit(game_over_text, text_rect)
         
         # Display score
-        final_score_text = subtitle_font.render(f"Final Score: {score}", True, WHITE)
+        final_score_text = text_cache.render(subtitle_font, f"Final Score: {score}", WHITE)
         final_score_rect = final_score_text.get_rect(center=(WIDTH//2, HEIGHT//2))
         screen.blit(final_score_text, final_score_rect)
         
         # Display high score
         if score >= high_score:
             high_score = score
-            high_score_text = subtitle_font.render(f"NEW HIGH SCORE!", True, YELLOW)
+            high_score_text = text_cache.render(subtitle_font, f"NEW HIGH SCORE!", YELLOW)
         else:
-            high_score_text = subtitle_font.render(f"High Score: {high_score}", True, WHITE)
+            high_score_text = text_cache.render(subtitle_font, f"High Score: {high_score}", WHITE)
         high_score_rect = high_score_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
         screen.blit(high_score_text, high_score_rect)
         
         # Restart instructions
-        restart_text = font.render("Press R to Restart or ESC for Menu", True, WHITE)
+        restart_text = text_cache.render(font, "Press R to Restart or ESC for Menu", WHITE)
         restart_rect = restart_text.get_rect(center=(WIDTH//2, HEIGHT*3//4))
         screen.blit(restart_text, restart_rect)
         
         # Update particles for visual effect
+        profiler.lap("other")
         update_particles()
+        profiler.lap("particles")
         
     elif game_state == LEVEL_COMPLETE:
         # Keep drawing the game state in the background
         draw_game_areas()
-        for vehicle in vehicles:
-            vehicle.draw()
-        for log in logs:
-            log.draw()
+        profiler.lap("draw_game_areas")
+        for lane in vehicle_lanes:
+            lane.draw()
+        profiler.lap("vehicles")
+        for lane in log_lanes:
+            lane.draw()
+        profiler.lap("logs")
         for pad in lilypads:
             pad.draw()
+        profiler.lap("lily_pads")
         
         # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT), pygame.SRCALPHA)
-        overlay.fill((0, 0, 0, 120))
-        screen.blit(overlay, (0, 0))
+        screen.blit(level_complete_overlay, (0, 0))
         
         # Level Complete Message
-        level_text = title_font.render(f"LEVEL {level-1} COMPLETE!", True, YELLOW)
+        level_text = text_cache.render(title_font, f"LEVEL {level-1} COMPLETE!", YELLOW)
         text_rect = level_text.get_rect(center=(WIDTH//2, HEIGHT//3))
         screen.blit(level_text, text_rect)
         
         # Next level message
-        next_level_text = subtitle_font.render(f"Get Ready for Level {level}", True, WHITE)
+        next_level_text = text_cache.render(subtitle_font, f"Get Ready for Level {level}", WHITE)
         next_level_rect = next_level_text.get_rect(center=(WIDTH//2, HEIGHT//2))
         screen.blit(next_level_text, next_level_rect)
         
         # Current score
-        score_text = font.render(f"Score: {score}", True, WHITE)
+        score_text = text_cache.render(font, f"Score: {score}", WHITE)
         score_rect = score_text.get_rect(center=(WIDTH//2, HEIGHT//2 + 60))
         screen.blit(score_text, score_rect)
         
         # Update particles for confetti effect
+        profiler.lap("other")
         update_particles()
+        profiler.lap("particles")
         
         # Timer to auto-continue
         level_complete_timer -= 1
@@ -645,18 +1091,19 @@ while running:
             # Reset for next level but keep score
             for pad in lilypads:
                 pad.occupied = False
-            vehicles = []
-            logs = []
+            for lane in vehicle_lanes + log_lanes:
+                lane.reset()
     
     # Draw UI elements (except in MENU state)
+    profiler.lap("other")
     if game_state != MENU:
         # Background panel for UI
         pygame.draw.rect(screen, (0, 0, 0, 180), (5, 5, 180, 110), border_radius=10)
         pygame.draw.rect(screen, WHITE, (5, 5, 180, 110), 2, border_radius=10)
         
-        score_text = font.render(f"Score: {score}", True, WHITE)
-        level_text = font.render(f"Level: {level}", True, WHITE)
-        lives_text = font.render(f"Lives: {frog.lives}", True, WHITE)
+        score_text = text_cache.render(font, f"Score: {score}", WHITE)
+        level_text = text_cache.render(font, f"Level: {level}", WHITE)
+        lives_text = text_cache.render(font, f"Lives: {frog.lives}", WHITE)
         
         screen.blit(score_text, (15, 15))
         screen.blit(level_text, (15, 45))
@@ -664,11 +1111,23 @@ while running:
         
         # Draw small frogs to represent lives
         for i in range(frog.lives):
-            small_frog = pygame.transform.scale(frog_img, (25, 25))
-            screen.blit(small_frog, (100 + i*30, 70))
+            screen.blit(frog_life_img, (100 + i*30, 70))
+    profiler.draw()
+    profiler.lap("hud")
     
     # Update display
     pygame.display.flip()
+    profiler.lap("flip")
+    profiler.end_frame()
+
+if recorder is not None:
+    recorder.close()
+if args.profile:
+    profiler.export(args.profile)
+if replayer is not None:
+    elapsed = time.perf_counter() - replay_start
+    print(f"Replayed {tick} ticks in {elapsed:.2f}s ({tick / max(elapsed, 1e-9):.0f} ticks/s): "
+          f"score={score} level={level} lives={frog.lives} high_score={high_score}")
 
 pygame.quit()
 sys.exit()
@@ -1,9 +1,13 @@
 import pygame
 import sys
-import random
 import time
 import os
+import queue
+import threading
+import itertools
 from pygame import mixer
+from collections import OrderedDict
+from tictaktoe_engine import Board, make_player
 
 # Initialize pygame
 pygame.init()
@@ -13,7 +17,11 @@ mixer.init()
 SCREEN_WIDTH = 800
 SCREEN_HEIGHT = 600
 BOARD_SIZE = 450
-CELL_SIZE = BOARD_SIZE // 3
+BOARD_X = (SCREEN_WIDTH - BOARD_SIZE) // 2
+BOARD_Y = (SCREEN_HEIGHT - BOARD_SIZE) // 2 - 20
+
+# Selectable boards as (cells per side, marks in a row needed to win)
+BOARD_VARIANTS = [(3, 3), (4, 4), (5, 4)]
 
 # Colors
 WHITE = (255, 255, 255)
@@ -58,9 +66,36 @@ GAME_PLAYING = 4
 GAME_OVER = 5
 HELP_SCREEN = 6
 
+# Minimum time (ms) before the computer plays; its move is searched in the
+# background during this pause, so slow searches only add to it once exceeded
+THINK_DELAY_MS = {"easy": 500, "medium": 800, "hard": 1200}
+
+
+class TextCache:
+    """Rendered text surfaces keyed by (font, text, color), least recently used dropped first"""
+
+    def __init__(self, max_size=128):
+        self.max_size = max_size
+        self.surfaces = OrderedDict()
+
+    def render(self, font, text, color):
+        key = (font, text, color)
+        surf = self.surfaces.get(key)
+        if surf is None:
+            surf = font.render(text, True, color)
+            self.surfaces[key] = surf
+            if len(self.surfaces) > self.max_size:
+                self.surfaces.popitem(last=False)
+        else:
+            self.surfaces.move_to_end(key)
+        return surf
+
+
+text_cache = TextCache()
+
 
 class Button:
-    def __init__(self, x, y, width, height, text, color=CYAN, hover_color=BLUE, text_color=WHITE):
+    def __init__(self, x, y, width, height, text, color=CYAN, hover_color=BLUE, text_color=WHITE, font=None):
         self.rect = pygame.Rect(x, y, width, height)
         self.text = text
         self.color = color
@@ -68,14 +103,15 @@ class Button:
         self.text_color = text_color
         self.current_color = color
         self.is_hovered = False
+        self.font = font
         
-    def draw(self, surface, font=medium_font):
+    def draw(self, surface, font=None):
         # Draw button with rounded corners
         pygame.draw.rect(surface, self.current_color, self.rect, border_radius=15)
         pygame.draw.rect(surface, DARK_GRAY, self.rect, 3, border_radius=15)
         
         # Draw text
-        text_surface = font.render(self.text, True, self.text_color)
+        text_surface = text_cache.render(font or self.font or medium_font, self.text, self.text_color)
         text_rect = text_surface.get_rect(center=self.rect.center)
         surface.blit(text_surface, text_rect)
     
@@ -85,17 +121,64 @@ class Button:
         self.current_color = self.hover_color if self.is_hovered else self.color
         
     def is_clicked(self, event):
+        # Hit-test the event position so buttons work without being drawn first
         if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
-            if self.is_hovered:
+            if self.rect.collidepoint(event.pos):
                 click_sound.play()
                 return True
         return False
 
 
-class TicTacToe:
+# Every game gets a new generation so moves still being searched for an
+# abandoned game are recognised and dropped
+game_generations = itertools.count(1)
+
+
+class AIWorker:
+    """Background thread that computes computer moves off the frame loop"""
+    
     def __init__(self):
-        # Game variables
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
+        self.requests = queue.Queue()
+        self.results = queue.Queue()
+        self.generation = None
+        self.thread = threading.Thread(target=self.run, name="tictactoe-ai", daemon=True)
+        self.thread.start()
+    
+    def submit(self, generation, player, board, symbol):
+        """Start searching for symbol's move; board must not be changed meanwhile"""
+        self.requests.put((generation, player, board, symbol))
+    
+    def run(self):
+        while True:
+            generation, player, board, symbol = self.requests.get()
+            if generation != self.generation:
+                # First move of a new game: drop search state kept from the last one
+                player.reset()
+                self.generation = generation
+            move = player.choose(board, symbol)
+            self.results.put((generation, move, player.nodes))
+    
+    def poll(self, generation):
+        """(move, nodes) if a result for generation has arrived, else None"""
+        while True:
+            try:
+                result_generation, move, nodes = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if result_generation == generation:
+                return move, nodes
+
+
+class TicTacToe:
+    def __init__(self, think_delays=None):
+        # Board variant: size x size cells, k marks in a row to win
+        self.size, self.k = BOARD_VARIANTS[0]
+        self.cell_size = BOARD_SIZE // self.size
+        
+        # Game variables: the bitboard holds the rules state, self.board is a
+        # list-of-lists view of it kept only for draw_board
+        self.state = Board(self.size, self.size, self.k)
+        self.board = self.state.rows()
         self.current_player = "X"
         self.game_mode = None
         self.player_symbol = None
@@ -107,17 +190,37 @@ class TicTacToe:
         
         # Animation variables
         self.board_alpha = 0
-        self.piece_alphas = [[0 for _ in range(3)] for _ in range(3)]
+        self.piece_alphas = [[0 for _ in range(self.size)] for _ in range(self.size)]
         self.win_alpha = 0
         self.animation_speed = 15  # Alpha increase per frame
         
+        # Once every fade has finished the whole board is one cached image
+        self.win_line = None
+        self.settled_surface = None
+        
         # Time tracking for computer move delay
         self.computer_think_time = 0
-        self.computer_move_time = 0
+        self.computer_result = None
+        self.think_delays = dict(THINK_DELAY_MS if think_delays is None else think_delays)
+        
+        # Computer players from tictaktoe_engine: MCTS for easy and medium, the
+        # solution table (3x3) or a deepening search (larger boards) for hard
+        self.players = {difficulty: make_player(difficulty) for difficulty in ("easy", "medium", "hard")}
+        self.nodes_searched = 0
+        self.worker = AIWorker()
+        self.generation = next(game_generations)
+        
+    def set_variant(self, size, k):
+        """Switch to a size x size board needing k in a row"""
+        self.size, self.k = size, k
+        self.cell_size = BOARD_SIZE // size
+        self.reset_game()
         
     def reset_game(self):
         """Reset the game state"""
-        self.board = [[" " for _ in range(3)] for _ in range(3)]
+        self.state = Board(self.size, self.size, self.k)
+        self.board = self.state.rows()
+        self.generation = next(game_generations)
         self.current_player = "X"
         self.winner = None
         self.game_over = False
@@ -125,18 +228,23 @@ class TicTacToe:
         
         # Reset animations
         self.board_alpha = 0
-        self.piece_alphas = [[0 for _ in range(3)] for _ in range(3)]
+        self.piece_alphas = [[0 for _ in range(self.size)] for _ in range(self.size)]
         self.win_alpha = 0
+        self.win_line = None
+        self.settled_surface = None
         self.computer_think_time = 0
-        self.computer_move_time = 0
+        self.computer_result = None
     
     def make_move(self, row, col):
         """Make a move on the board"""
-        if 0 <= row < 3 and 0 <= col < 3 and self.board[row][col] == " " and not self.game_over:
+        cell = row * self.size + col
+        if 0 <= row < self.size and 0 <= col < self.size and self.state.is_empty(cell) and not self.game_over:
+            self.state.place(cell, self.current_player)
             self.board[row][col] = self.current_player
+            self.settled_surface = None
             
             # Check for win or draw
-            if self.check_winner():
+            if self.check_winner(cell):
                 self.game_over = True
                 self.winner = self.current_player
                 win_sound.play()
@@ -149,311 +257,267 @@ class TicTacToe:
             return True
         return False
     
-    def check_winner(self):
-        """Check if there's a winner and set winning cells"""
-        # Check rows
-        for i in range(3):
-            if self.board[i][0] == self.board[i][1] == self.board[i][2] != " ":
-                self.winning_cells = [(i, 0), (i, 1), (i, 2)]
-                return True
+    def check_winner(self, last_move=None):
+        """Check if there's a winner and set winning cells
         
-        # Check columns
-        for i in range(3):
-            if self.board[0][i] == self.board[1][i] == self.board[2][i] != " ":
-                self.winning_cells = [(0, i), (1, i), (2, i)]
+        With last_move given only the lines through that cell are examined.
+        """
+        players = ("X", "O") if last_move is None else (self.current_player,)
+        for player in players:
+            line = self.state.winning_line(player, last_move)
+            if line:
+                self.winning_cells = [divmod(cell, self.size) for cell in self.state.line_cells(line)]
                 return True
-        
-        # Check diagonals
-        if self.board[0][0] == self.board[1][1] == self.board[2][2] != " ":
-            self.winning_cells = [(0, 0), (1, 1), (2, 2)]
-            return True
-        
-        if self.board[0][2] == self.board[1][1] == self.board[2][0] != " ":
-            self.winning_cells = [(0, 2), (1, 1), (2, 0)]
-            return True
-        
         return False
     
     def is_draw(self):
         """Check if the game is a draw"""
-        for row in self.board:
-            if " " in row:
-                return False
-        return True
+        return self.state.is_full()
     
     def switch_player(self):
         """Switch the current player"""
         self.current_player = "O" if self.current_player == "X" else "X"
-        
-    def computer_move_easy(self):
-        """Make a random computer move"""
-        empty_cells = []
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    empty_cells.append((i, j))
-        
-        if empty_cells:
-            row, col = random.choice(empty_cells)
-            return row, col
-        return None
-    
-    def computer_move_medium(self):
-        """Make a smarter computer move"""
-        # Check if computer can win
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    self.board[i][j] = self.computer_symbol
-                    if self.check_winner():
-                        self.board[i][j] = " "
-                        self.winning_cells = []
-                        return i, j
-                    self.board[i][j] = " "
-        
-        # Check if player can win and block
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    self.board[i][j] = self.player_symbol
-                    if self.check_winner():
-                        self.board[i][j] = " "
-                        self.winning_cells = []
-                        return i, j
-                    self.board[i][j] = " "
-        
-        # Try to take center
-        if self.board[1][1] == " ":
-            return 1, 1
-        
-        # Take corners if available
-        corners = [(0, 0), (0, 2), (2, 0), (2, 2)]
-        random.shuffle(corners)
-        for i, j in corners:
-            if self.board[i][j] == " ":
-                return i, j
-        
-        # Take edges
-        edges = [(0, 1), (1, 0), (1, 2), (2, 1)]
-        random.shuffle(edges)
-        for i, j in edges:
-            if self.board[i][j] == " ":
-                return i, j
-        
-        return None
-    
-    def minimax(self, board, depth, is_maximizing):
-        """Minimax algorithm for hard difficulty"""
-        # Check for terminal states
-        if self.check_winner_minimax(board, self.computer_symbol):
-            return 10 - depth
-        if self.check_winner_minimax(board, self.player_symbol):
-            return depth - 10
-        
-        # Check for draw
-        is_full = True
-        for row in board:
-            if " " in row:
-                is_full = False
-                break
-        if is_full:
-            return 0
-        
-        if is_maximizing:
-            best_score = -float('inf')
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == " ":
-                        board[i][j] = self.computer_symbol
-                        score = self.minimax(board, depth + 1, False)
-                        board[i][j] = " "
-                        best_score = max(score, best_score)
-            return best_score
-        else:
-            best_score = float('inf')
-            for i in range(3):
-                for j in range(3):
-                    if board[i][j] == " ":
-                        board[i][j] = self.player_symbol
-                        score = self.minimax(board, depth + 1, True)
-                        board[i][j] = " "
-                        best_score = min(score, best_score)
-            return best_score
-    
-    def check_winner_minimax(self, board, player):
-        """Helper function for minimax to check winner"""
-        # Check rows
-        for i in range(3):
-            if board[i][0] == board[i][1] == board[i][2] == player:
-                return True
-        
-        # Check columns
-        for i in range(3):
-            if board[0][i] == board[1][i] == board[2][i] == player:
-                return True
-        
-        # Check diagonals
-        if board[0][0] == board[1][1] == board[2][2] == player:
-            return True
-        if board[0][2] == board[1][1] == board[2][0] == player:
-            return True
-        
-        return False
-    
-    def computer_move_hard(self):
-        """Make an optimal move using minimax algorithm"""
-        best_score = -float('inf')
-        best_move = None
-        
-        for i in range(3):
-            for j in range(3):
-                if self.board[i][j] == " ":
-                    self.board[i][j] = self.computer_symbol
-                    score = self.minimax(self.board, 0, False)
-                    self.board[i][j] = " "
-                    
-                    if score > best_score:
-                        best_score = score
-                        best_move = (i, j)
-        
-        if best_move:
-            return best_move
-        return None
-    
-    def computer_move(self):
-        """Make a computer move based on difficulty"""
-        if self.difficulty == "easy":
-            return self.computer_move_easy()
-        elif self.difficulty == "medium":
-            return self.computer_move_medium()
-        else:  # hard
-            return self.computer_move_hard()
     
     def draw_board(self, surface, x_offset, y_offset):
         """Draw the game board with animations"""
-        # Create a board surface with transparency
-        board_surface = pygame.Surface((BOARD_SIZE, BOARD_SIZE), pygame.SRCALPHA)
+        if self.settled_surface is not None:
+            surface.blit(self.settled_surface, (x_offset, y_offset))
+            return
         
         # Animate board alpha
         if self.board_alpha < 255:
-            self.board_alpha += self.animation_speed
-            if self.board_alpha > 255:
-                self.board_alpha = 255
+            self.board_alpha = min(255, self.board_alpha + self.animation_speed)
         
-        # Draw board background
-        board_surface.fill((255, 255, 255, self.board_alpha))
-        
-        # Draw grid lines with animation
-        line_alpha = min(255, self.board_alpha + 40)
-        line_color = (*BLACK[:3], line_alpha)
-        line_width = 6
-        
-        # Vertical lines
-        pygame.draw.line(board_surface, line_color, (CELL_SIZE, 0), 
-                         (CELL_SIZE, BOARD_SIZE), line_width)
-        pygame.draw.line(board_surface, line_color, (CELL_SIZE * 2, 0), 
-                         (CELL_SIZE * 2, BOARD_SIZE), line_width)
-        
-        # Horizontal lines
-        pygame.draw.line(board_surface, line_color, (0, CELL_SIZE), 
-                         (BOARD_SIZE, CELL_SIZE), line_width)
-        pygame.draw.line(board_surface, line_color, (0, CELL_SIZE * 2), 
-                         (BOARD_SIZE, CELL_SIZE * 2), line_width)
-        
-        # Draw X's and O's with animations
-        for i in range(3):
-            for j in range(3):
-                cell_center_x = j * CELL_SIZE + CELL_SIZE // 2
-                cell_center_y = i * CELL_SIZE + CELL_SIZE // 2
-                
-                # Animate piece alpha when placed
+        # Animate piece alpha when placed
+        for i in range(self.size):
+            for j in range(self.size):
                 if self.board[i][j] != " " and self.piece_alphas[i][j] < 255:
-                    self.piece_alphas[i][j] += self.animation_speed
-                    if self.piece_alphas[i][j] > 255:
-                        self.piece_alphas[i][j] = 255
-                
-                if self.board[i][j] == "X":
-                    x_color = (*RED[:3], self.piece_alphas[i][j])
-                    # Draw X
-                    line_length = CELL_SIZE // 2 - 20
-                    pygame.draw.line(board_surface, x_color, 
-                                     (cell_center_x - line_length, cell_center_y - line_length),
-                                     (cell_center_x + line_length, cell_center_y + line_length), 10)
-                    pygame.draw.line(board_surface, x_color, 
-                                     (cell_center_x - line_length, cell_center_y + line_length),
-                                     (cell_center_x + line_length, cell_center_y - line_length), 10)
-                elif self.board[i][j] == "O":
-                    o_color = (*BLUE[:3], self.piece_alphas[i][j])
-                    # Draw O
-                    radius = CELL_SIZE // 2 - 20
-                    pygame.draw.circle(board_surface, o_color, (cell_center_x, cell_center_y), radius, 10)
+                    self.piece_alphas[i][j] = min(255, self.piece_alphas[i][j] + self.animation_speed)
         
-        # Draw winning line if there's a winner
+        # Animate winning line
         if self.winner and self.winning_cells:
-            # Animate winning line
+            if self.win_line is None:
+                self.win_line = self.render_win_line()
             if self.win_alpha < 255:
-                self.win_alpha += self.animation_speed
-                if self.win_alpha > 255:
-                    self.win_alpha = 255
-            
-            win_color = (*YELLOW[:3], self.win_alpha)
-            
-            # Get start and end points of winning line
-            start_cell = self.winning_cells[0]
-            end_cell = self.winning_cells[2]
-            
-            start_x = start_cell[1] * CELL_SIZE + CELL_SIZE // 2
-            start_y = start_cell[0] * CELL_SIZE + CELL_SIZE // 2
-            end_x = end_cell[1] * CELL_SIZE + CELL_SIZE // 2
-            end_y = end_cell[0] * CELL_SIZE + CELL_SIZE // 2
-            
-            # Draw winning line
-            pygame.draw.line(board_surface, win_color, (start_x, start_y), (end_x, end_y), 12)
+                self.win_alpha = min(255, self.win_alpha + self.animation_speed)
         
-        # Draw the board surface on the main surface
-        surface.blit(board_surface, (x_offset, y_offset))
+        if self.is_animating():
+            self.compose_board(surface, x_offset, y_offset)
+        else:
+            # Everything is fully faded in: flatten to one surface until the next move
+            self.settled_surface = pygame.Surface((BOARD_SIZE, BOARD_SIZE))
+            self.compose_board(self.settled_surface, 0, 0)
+            surface.blit(self.settled_surface, (x_offset, y_offset))
+    
+    def compose_board(self, surface, x_offset, y_offset):
+        """Blit the board layers at their current fade levels"""
+        sprites = get_board_sprites(self.size)
+        
+        # Draw board background and grid lines
+        # An opaque surface with a surface alpha of 255 still takes the slow blending path
+        sprites.background.set_alpha(self.board_alpha if self.board_alpha < 255 else None)
+        surface.blit(sprites.background, (x_offset, y_offset))
+        line_alpha = min(255, self.board_alpha + 40)
+        for line, (line_x, line_y) in sprites.grid_lines:
+            line.set_alpha(line_alpha)
+            surface.blit(line, (x_offset + line_x, y_offset + line_y))
+        
+        # Draw X's and O's
+        cell_size = self.cell_size
+        for i in range(self.size):
+            for j in range(self.size):
+                piece = self.board[i][j]
+                if piece == " ":
+                    continue
+                sprite = sprites.x if piece == "X" else sprites.o
+                sprite.set_alpha(self.piece_alphas[i][j])
+                surface.blit(sprite, (x_offset + j * cell_size, y_offset + i * cell_size))
+        
+        # Draw winning line if there's a winner
+        if self.win_line is not None:
+            win_line, (line_x, line_y) = self.win_line
+            win_line.set_alpha(self.win_alpha)
+            surface.blit(win_line, (x_offset + line_x, y_offset + line_y))
+    
+    def render_win_line(self):
+        """Winning line through the centers of its first and last cells, with its offset"""
+        cell_size = self.cell_size
+        start_cell = self.winning_cells[0]
+        end_cell = self.winning_cells[-1]
+        
+        start_x = start_cell[1] * cell_size + cell_size // 2
+        start_y = start_cell[0] * cell_size + cell_size // 2
+        end_x = end_cell[1] * cell_size + cell_size // 2
+        end_y = end_cell[0] * cell_size + cell_size // 2
+        
+        win_line = pygame.Surface((BOARD_SIZE, BOARD_SIZE), pygame.SRCALPHA)
+        pygame.draw.line(win_line, YELLOW, (start_x, start_y), (end_x, end_y), 12)
+        return crop(win_line)
+    
+    def is_animating(self):
+        """Whether any fade-in is still running, so the board must keep redrawing"""
+        if self.board_alpha < 255:
+            return True
+        if self.winner and self.winning_cells and self.win_alpha < 255:
+            return True
+        for board_row, alpha_row in zip(self.board, self.piece_alphas):
+            for piece, alpha in zip(board_row, alpha_row):
+                if piece != " " and alpha < 255:
+                    return True
+        return False
+    
+    def is_thinking(self):
+        """Whether the computer is working out its move"""
+        return self.game_mode == "single" and self.current_player == self.computer_symbol and not self.game_over
     
     def handle_computer_turn(self, current_time):
-        """Handle the computer's turn with timing delay"""
-        if self.current_player == self.computer_symbol and not self.game_over:
-            if self.computer_think_time == 0:
-                # Start the timer
-                self.computer_think_time = current_time
+        """Handle the computer's turn with timing delay; returns True once it has moved
+        
+        The move is searched on the worker thread from the first frame of the
+        turn and played once it has arrived and the think delay has passed.
+        """
+        if not self.is_thinking():
+            return False
+        
+        if self.computer_think_time == 0:
+            # Start the timer and the search together
+            self.computer_think_time = current_time
+            player = self.players[self.difficulty]
+            self.worker.submit(self.generation, player, self.state.copy(), self.computer_symbol)
+        
+        if self.computer_result is None:
+            self.computer_result = self.worker.poll(self.generation)
+        
+        # Cosmetic delay before the computer moves
+        think_delay = self.think_delays.get(self.difficulty, 0)
+        
+        if self.computer_result is not None and current_time - self.computer_think_time >= think_delay:
+            move, self.nodes_searched = self.computer_result
             
-            # Add a delay before the computer moves
-            think_delay = 500  # 500 ms for easy, longer for harder difficulties
-            if self.difficulty == "medium":
-                think_delay = 800
-            elif self.difficulty == "hard":
-                think_delay = 1200
+            # Reset timers
+            self.computer_think_time = 0
+            self.computer_result = None
             
-            if current_time - self.computer_think_time >= think_delay:
-                if self.computer_move_time == 0:
-                    # Make the move
-                    move = self.computer_move()
-                    if move:
-                        row, col = move
-                        self.make_move(row, col)
-                        click_sound.play()
-                        self.computer_move_time = current_time
-                        
-                        # Reset timers
-                        self.computer_think_time = 0
-                        self.computer_move_time = 0
+            if move is not None:
+                row, col = divmod(move, self.size)
+                self.make_move(row, col)
+                click_sound.play()
+                return True
+        return False
 
 
-def draw_start_menu(surface):
-    """Draw the start menu screen"""
-    # Draw background
-    surface.fill(LIGHT_GRAY)
-    
-    # Create gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 100 - int(i / SCREEN_HEIGHT * 100)
-        pygame.draw.line(gradient_surface, (0, 0, 255, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
+class BoardSprites:
+    """Background, grid and X/O images for one board size, drawn once and faded with set_alpha"""
     
+    def __init__(self, size):
+        cell_size = BOARD_SIZE // size
+        
+        self.background = pygame.Surface((BOARD_SIZE, BOARD_SIZE))
+        self.background.fill(WHITE)
+        
+        # Grid lines are kept as thin strips: blitting a mostly transparent
+        # board-sized surface with a surface alpha is several times slower
+        self.grid_lines = []
+        line_width = 6
+        for i in range(1, size):
+            # Vertical line
+            line = pygame.Surface((BOARD_SIZE, BOARD_SIZE), pygame.SRCALPHA)
+            pygame.draw.line(line, BLACK, (cell_size * i, 0), 
+                             (cell_size * i, BOARD_SIZE), line_width)
+            self.grid_lines.append(crop(line))
+            # Horizontal line
+            line = pygame.Surface((BOARD_SIZE, BOARD_SIZE), pygame.SRCALPHA)
+            pygame.draw.line(line, BLACK, (0, cell_size * i), 
+                             (BOARD_SIZE, cell_size * i), line_width)
+            self.grid_lines.append(crop(line))
+        
+        center = cell_size // 2
+        piece_margin = cell_size // 7
+        
+        # X sprite
+        self.x = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+        line_length = center - piece_margin
+        pygame.draw.line(self.x, RED, 
+                         (center - line_length, center - line_length),
+                         (center + line_length, center + line_length), 10)
+        pygame.draw.line(self.x, RED, 
+                         (center - line_length, center + line_length),
+                         (center + line_length, center - line_length), 10)
+        
+        # O sprite
+        self.o = pygame.Surface((cell_size, cell_size), pygame.SRCALPHA)
+        pygame.draw.circle(self.o, BLUE, (center, center), center - piece_margin, 10)
+
+
+def crop(surface):
+    """The visible part of surface and its offset within it"""
+    rect = surface.get_bounding_rect()
+    return surface.subsurface(rect).copy(), rect.topleft
+
+
+_board_sprites = {}
+
+
+def get_board_sprites(size):
+    sprites = _board_sprites.get(size)
+    if sprites is None:
+        sprites = _board_sprites[size] = BoardSprites(size)
+    return sprites
+
+
+class Scene:
+    """A menu screen whose background, gradient and static art are drawn once
+    
+    The cached background is blitted each frame and only the buttons, whose
+    colour follows the mouse, are drawn on top of it.
+    """
+    
+    def __init__(self, gradient_color, gradient_alpha, buttons, decorate=None):
+        self.gradient_color = gradient_color
+        self.gradient_alpha = gradient_alpha
+        self.buttons = buttons
+        self.decorate = decorate
+        self.background = None
+    
+    def build_background(self):
+        background = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT))
+        background.fill(LIGHT_GRAY)
+        
+        # Create gradient effect
+        gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
+        for i in range(SCREEN_HEIGHT):
+            alpha = self.gradient_alpha - int(i / SCREEN_HEIGHT * self.gradient_alpha)
+            pygame.draw.line(gradient_surface, (*self.gradient_color, alpha), (0, i), (SCREEN_WIDTH, i))
+        background.blit(gradient_surface, (0, 0))
+        
+        if self.decorate:
+            self.decorate(background)
+        return background
+    
+    def draw(self, surface):
+        self.draw_background(surface)
+        self.draw_buttons(surface)
+    
+    def draw_background(self, surface):
+        if self.background is None:
+            self.background = self.build_background()
+        surface.blit(self.background, (0, 0))
+    
+    def draw_buttons(self, surface):
+        # Get mouse position for hover effects
+        mouse_pos = pygame.mouse.get_pos()
+        for button in self.buttons:
+            button.update(mouse_pos)
+            button.draw(surface)
+
+
+def draw_title(surface, text, y):
+    title_text = large_font.render(text, True, PURPLE)
+    text_x = SCREEN_WIDTH // 2 - title_text.get_width() // 2
+    surface.blit(title_text, (text_x, y))
+
+
+def decorate_start_menu(surface):
     # Draw title with shadow effect
     title_shadow = title_font.render("TIC TAC TOE", True, BLACK)
     title_text = title_font.render("TIC TAC TOE", True, YELLOW)
@@ -480,223 +544,24 @@ def draw_start_menu(surface):
     
     # Draw O
     pygame.draw.circle(surface, BLUE, (o_center, y_center), 60, 15)
-    
-    # Draw buttons
-    play_button = Button(SCREEN_WIDTH // 2 - 100, 350, 200, 60, "PLAY", CYAN)
-    help_button = Button(SCREEN_WIDTH // 2 - 100, 430, 200, 60, "HOW TO PLAY", GREEN)
-    quit_button = Button(SCREEN_WIDTH // 2 - 100, 510, 200, 60, "QUIT", RED)
-    
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Update and draw buttons
-    play_button.update(mouse_pos)
-    help_button.update(mouse_pos)
-    quit_button.update(mouse_pos)
-    
-    play_button.draw(surface)
-    help_button.draw(surface)
-    quit_button.draw(surface)
-    
-    return play_button, help_button, quit_button
 
 
-def draw_mode_selection(surface):
-    """Draw the game mode selection screen"""
-    surface.fill(LIGHT_GRAY)
-    
-    # Create gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 80 - int(i / SCREEN_HEIGHT * 80)
-        pygame.draw.line(gradient_surface, (0, 180, 0, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
-    
-    # Draw title
-    title_text = large_font.render("Select Game Mode", True, PURPLE)
-    text_x = SCREEN_WIDTH // 2 - title_text.get_width() // 2
-    surface.blit(title_text, (text_x, 80))
-    
-    # Draw buttons
-    single_player_button = Button(SCREEN_WIDTH // 2 - 150, 200, 300, 80, "Single Player", CYAN)
-    two_player_button = Button(SCREEN_WIDTH // 2 - 150, 320, 300, 80, "Two Players", GREEN)
-    back_button = Button(SCREEN_WIDTH // 2 - 150, 440, 300, 60, "Back", YELLOW)
-    
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Update and draw buttons
-    single_player_button.update(mouse_pos)
-    two_player_button.update(mouse_pos)
-    back_button.update(mouse_pos)
-    
-    single_player_button.draw(surface)
-    two_player_button.draw(surface)
-    back_button.draw(surface)
-    
-    return single_player_button, two_player_button, back_button
-
-
-def draw_difficulty_selection(surface):
-    """Draw the difficulty selection screen"""
-    surface.fill(LIGHT_GRAY)
-    
-    # Create gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 80 - int(i / SCREEN_HEIGHT * 80)
-        pygame.draw.line(gradient_surface, (0, 0, 180, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
-    
-    # Draw title
-    title_text = large_font.render("Select Difficulty", True, PURPLE)
-    text_x = SCREEN_WIDTH // 2 - title_text.get_width() // 2
-    surface.blit(title_text, (text_x, 80))
-    
-    # Draw buttons
-    easy_button = Button(SCREEN_WIDTH // 2 - 125, 180, 250, 70, "Easy", GREEN)
-    medium_button = Button(SCREEN_WIDTH // 2 - 125, 270, 250, 70, "Medium", YELLOW)
-    hard_button = Button(SCREEN_WIDTH // 2 - 125, 360, 250, 70, "Hard", RED)
-    back_button = Button(SCREEN_WIDTH // 2 - 125, 450, 250, 60, "Back", CYAN)
-    
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Update and draw buttons
-    easy_button.update(mouse_pos)
-    medium_button.update(mouse_pos)
-    hard_button.update(mouse_pos)
-    back_button.update(mouse_pos)
-    
-    easy_button.draw(surface)
-    medium_button.draw(surface)
-    hard_button.draw(surface)
-    back_button.draw(surface)
-    
-    return easy_button, medium_button, hard_button, back_button
-
-
-def draw_symbol_selection(surface):
-    """Draw the symbol selection screen"""
-    surface.fill(LIGHT_GRAY)
-    
-    # Create gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 80 - int(i / SCREEN_HEIGHT * 80)
-        pygame.draw.line(gradient_surface, (180, 0, 180, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
-    
-    # Draw title
-    title_text = large_font.render("Choose Your Symbol", True, PURPLE)
-    text_x = SCREEN_WIDTH // 2 - title_text.get_width() // 2
-    surface.blit(title_text, (text_x, 80))
-    
-    # Draw buttons
-    x_button = Button(SCREEN_WIDTH // 2 - 200, 220, 150, 150, "X", RED)
-    o_button = Button(SCREEN_WIDTH // 2 + 50, 220, 150, 150, "O", BLUE)
-    back_button = Button(SCREEN_WIDTH // 2 - 100, 430, 200, 60, "Back", CYAN)
-    
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Update and draw buttons
-    x_button.update(mouse_pos)
-    o_button.update(mouse_pos)
-    back_button.update(mouse_pos)
-    
-    # Use larger font for X and O
-    x_button.draw(surface, large_font)
-    o_button.draw(surface, large_font)
-    back_button.draw(surface)
+def decorate_symbol_selection(surface):
+    draw_title(surface, "Choose Your Symbol", 80)
     
     # Add labels
     x_label = small_font.render("(Goes First)", True, BLACK)
     surface.blit(x_label, (SCREEN_WIDTH // 2 - 200 + 75 - x_label.get_width() // 2, 380))
-    
-    return x_button, o_button, back_button
 
 
-def draw_game_screen(surface, game):
-    """Draw the game screen"""
-    surface.fill(LIGHT_GRAY)
-    
-    # Create subtle gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 40 - int(i / SCREEN_HEIGHT * 40)
-        pygame.draw.line(gradient_surface, (100, 100, 200, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
-    
-    # Calculate board position (centered)
-    board_x = (SCREEN_WIDTH - BOARD_SIZE) // 2
-    board_y = (SCREEN_HEIGHT - BOARD_SIZE) // 2 - 20
-    
-    # Draw game status
-    status_text = ""
-    if game.game_over:
-        if game.winner:
-            if game.game_mode == "single":
-                if game.winner == game.player_symbol:
-                    status_text = "You Win!"
-                else:
-                    status_text = "Computer Wins"
-            else:
-                status_text = f"Player {game.winner} Wins!"
-        else:
-            status_text = "It's a Draw!"
-    else:
-        if game.game_mode == "single" and game.current_player == game.computer_symbol:
-            status_text = "Computer's Turn..."
-        elif game.game_mode == "single":
-            status_text = "Your Turn"
-        else:
-            status_text = f"Player {game.current_player}'s Turn"
-    
-    status_surface = medium_font.render(status_text, True, PURPLE)
-    surface.blit(status_surface, (SCREEN_WIDTH // 2 - status_surface.get_width() // 2, 50))
-    
-    # Draw board
-    game.draw_board(surface, board_x, board_y)
-    
-    # Draw buttons
-    reset_button = Button(100, 500, 200, 60, "New Game", GREEN)
-    menu_button = Button(SCREEN_WIDTH - 300, 500, 200, 60, "Main Menu", CYAN)
-    
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    
-    # Update and draw buttons
-    reset_button.update(mouse_pos)
-    menu_button.update(mouse_pos)
-    
-    reset_button.draw(surface)
-    menu_button.draw(surface)
-    
-    return reset_button, menu_button, board_x, board_y
-
-
-def draw_help_screen(surface):
-    """Draw the help screen"""
-    surface.fill(LIGHT_GRAY)
-    
-    # Create gradient effect
-    gradient_surface = pygame.Surface((SCREEN_WIDTH, SCREEN_HEIGHT), pygame.SRCALPHA)
-    for i in range(SCREEN_HEIGHT):
-        alpha = 60 - int(i / SCREEN_HEIGHT * 60)
-        pygame.draw.line(gradient_surface, (0, 180, 180, alpha), (0, i), (SCREEN_WIDTH, i))
-    surface.blit(gradient_surface, (0, 0))
-    
-    # Draw title
-    title_text = large_font.render("How To Play", True, PURPLE)
-    text_x = SCREEN_WIDTH // 2 - title_text.get_width() // 2
-    surface.blit(title_text, (text_x, 50))
+def decorate_help_screen(surface):
+    draw_title(surface, "How To Play", 50)
     
     # Draw instructions
     instructions = [
-        "1. The game is played on a 3x3 grid.",
+        "1. The game is played on a 3x3, 4x4 or 5x5 grid.",
         "2. Players take turns placing X or O in empty spaces.",
-        "3. The first player to get 3 marks in a row",
+        "3. The first player to get 3 marks in a row (4 on 4x4/5x5)",
         "   (horizontally, vertically, or diagonally) wins.",
         "4. If all spaces are filled with no winner, it's a draw.",
         "",
@@ -706,9 +571,9 @@ def draw_help_screen(surface):
         "• Two Players: Play against a friend on the same device.",
         "",
         "Difficulty Levels:",
-        "• Easy: Computer makes random moves.",
-        "• Medium: Computer can block your winning moves.",
-        "• Hard: Computer plays optimally and cannot be beaten.",
+        "• Easy: Computer tries a few random games per move.",
+        "• Medium: Computer plays out hundreds of games per move.",
+        "• Hard: Unbeatable on 3x3; a timed deep search on 4x4/5x5.",
     ]
     
     y_pos = 130
@@ -754,16 +619,134 @@ def draw_help_screen(surface):
     o_center_x = example_board_x + example_cell_size // 2 + example_cell_size
     o_center_y = example_board_y + example_cell_size // 2 + example_cell_size
     pygame.draw.circle(surface, BLUE, (o_center_x, o_center_y), line_length, 5)
+
+
+# One scene per menu state, with buttons that persist between frames
+start_menu_scene = Scene((0, 0, 255), 100, (
+    Button(SCREEN_WIDTH // 2 - 100, 350, 200, 60, "PLAY", CYAN),
+    Button(SCREEN_WIDTH // 2 - 100, 430, 200, 60, "HOW TO PLAY", GREEN),
+    Button(SCREEN_WIDTH // 2 - 100, 510, 200, 60, "QUIT", RED),
+), decorate_start_menu)
+
+mode_selection_scene = Scene((0, 180, 0), 80, (
+    Button(SCREEN_WIDTH // 2 - 150, 160, 300, 80, "Single Player", CYAN),
+    Button(SCREEN_WIDTH // 2 - 150, 260, 300, 80, "Two Players", GREEN),
+    Button(SCREEN_WIDTH // 2 - 150, 360, 300, 60, "", PURPLE, font=small_font),
+    Button(SCREEN_WIDTH // 2 - 150, 450, 300, 60, "Back", YELLOW),
+), lambda surface: draw_title(surface, "Select Game Mode", 60))
+
+difficulty_selection_scene = Scene((0, 0, 180), 80, (
+    Button(SCREEN_WIDTH // 2 - 125, 180, 250, 70, "Easy", GREEN),
+    Button(SCREEN_WIDTH // 2 - 125, 270, 250, 70, "Medium", YELLOW),
+    Button(SCREEN_WIDTH // 2 - 125, 360, 250, 70, "Hard", RED),
+    Button(SCREEN_WIDTH // 2 - 125, 450, 250, 60, "Back", CYAN),
+), lambda surface: draw_title(surface, "Select Difficulty", 80))
+
+# Use larger font for X and O
+symbol_selection_scene = Scene((180, 0, 180), 80, (
+    Button(SCREEN_WIDTH // 2 - 200, 220, 150, 150, "X", RED, font=large_font),
+    Button(SCREEN_WIDTH // 2 + 50, 220, 150, 150, "O", BLUE, font=large_font),
+    Button(SCREEN_WIDTH // 2 - 100, 430, 200, 60, "Back", CYAN),
+), decorate_symbol_selection)
+
+game_scene = Scene((100, 100, 200), 40, (
+    Button(100, 500, 200, 60, "New Game", GREEN),
+    Button(SCREEN_WIDTH - 300, 500, 200, 60, "Main Menu", CYAN),
+))
+
+help_scene = Scene((0, 180, 180), 60, (
+    Button(SCREEN_WIDTH // 2 - 100, 500, 200, 60, "Back", CYAN),
+), decorate_help_screen)
+
+
+def draw_start_menu(surface):
+    """Draw the start menu screen"""
+    start_menu_scene.draw(surface)
+    return start_menu_scene.buttons
+
+
+def draw_mode_selection(surface, size=3, k=3):
+    """Draw the game mode selection screen"""
+    mode_selection_scene.buttons[2].text = f"Board: {size}x{size}, {k} in a row"
+    mode_selection_scene.draw(surface)
+    return mode_selection_scene.buttons
+
+
+def draw_difficulty_selection(surface):
+    """Draw the difficulty selection screen"""
+    difficulty_selection_scene.draw(surface)
+    return difficulty_selection_scene.buttons
+
+
+def draw_symbol_selection(surface):
+    """Draw the symbol selection screen"""
+    symbol_selection_scene.draw(surface)
+    return symbol_selection_scene.buttons
+
+
+def game_status_text(game):
+    if game.game_over:
+        if game.winner:
+            if game.game_mode == "single":
+                if game.winner == game.player_symbol:
+                    return "You Win!"
+                return "Computer Wins"
+            return f"Player {game.winner} Wins!"
+        return "It's a Draw!"
+    if game.game_mode == "single" and game.current_player == game.computer_symbol:
+        return "Computer's Turn"
+    elif game.game_mode == "single":
+        return "Your Turn"
+    return f"Player {game.current_player}'s Turn"
+
+
+def draw_game_screen(surface, game):
+    """Draw the game screen"""
+    game_scene.draw_background(surface)
     
-    # Draw back button
-    back_button = Button(SCREEN_WIDTH // 2 - 100, 500, 200, 60, "Back", CYAN)
+    # Draw game status
+    status_surface = text_cache.render(medium_font, game_status_text(game), PURPLE)
+    status_x = SCREEN_WIDTH // 2 - status_surface.get_width() // 2
+    surface.blit(status_surface, (status_x, 50))
+    
+    # Thinking animation: three dots after the status, one lit at a time
+    if game.is_thinking():
+        lit = pygame.time.get_ticks() // 250 % 3
+        dot_y = 50 + status_surface.get_height() // 2
+        for i in range(3):
+            dot_x = status_x + status_surface.get_width() + 15 + i * 18
+            pygame.draw.circle(surface, PURPLE if i == lit else GRAY, (dot_x, dot_y), 6 if i == lit else 4)
     
-    # Get mouse position for hover effects
-    mouse_pos = pygame.mouse.get_pos()
-    back_button.update(mouse_pos)
-    back_button.draw(surface)
+    # Draw board
+    game.draw_board(surface, BOARD_X, BOARD_Y)
+    
+    # Draw buttons
+    game_scene.draw_buttons(surface)
     
-    return back_button
+    reset_button, menu_button = game_scene.buttons
+    return reset_button, menu_button, BOARD_X, BOARD_Y
+
+
+def draw_help_screen(surface):
+    """Draw the help screen"""
+    help_scene.draw(surface)
+    return help_scene.buttons[0]
+
+
+def draw_screen(surface, state, game):
+    """Render the screen for the given game state"""
+    if state == START_MENU:
+        draw_start_menu(surface)
+    elif state == MODE_SELECTION:
+        draw_mode_selection(surface, game.size, game.k)
+    elif state == DIFFICULTY_SELECTION:
+        draw_difficulty_selection(surface)
+    elif state == SYMBOL_SELECTION:
+        draw_symbol_selection(surface)
+    elif state == GAME_PLAYING:
+        draw_game_screen(surface, game)
+    elif state == HELP_SCREEN:
+        draw_help_screen(surface)
 
 
 def main():
@@ -772,18 +755,21 @@ def main():
     game = TicTacToe()
     current_state = START_MENU
     running = True
+    needs_redraw = True
     
     while running:
         current_time = pygame.time.get_ticks()
         
-        # Handle events
+        # Handle events; buttons are hit-tested on the persistent scenes, nothing is drawn here
         for event in pygame.event.get():
+            # Any event, mouse motion included (hover colours), may change the screen
+            needs_redraw = True
             if event.type == pygame.QUIT:
                 running = False
             
             # Handle state-specific events
             if current_state == START_MENU:
-                play_button, help_button, quit_button = draw_start_menu(screen)
+                play_button, help_button, quit_button = start_menu_scene.buttons
                 
                 if play_button.is_clicked(event):
                     current_state = MODE_SELECTION
@@ -793,7 +779,7 @@ def main():
                     running = False
             
             elif current_state == MODE_SELECTION:
-                single_player_button, two_player_button, back_button = draw_mode_selection(screen)
+                single_player_button, two_player_button, board_button, back_button = mode_selection_scene.buttons
                 
                 if single_player_button.is_clicked(event):
                     game.game_mode = "single"
@@ -802,11 +788,15 @@ def main():
                     game.game_mode = "two_player"
                     game.reset_game()
                     current_state = GAME_PLAYING
+                elif board_button.is_clicked(event):
+                    # Cycle through the board variants
+                    index = BOARD_VARIANTS.index((game.size, game.k))
+                    game.set_variant(*BOARD_VARIANTS[(index + 1) % len(BOARD_VARIANTS)])
                 elif back_button.is_clicked(event):
                     current_state = START_MENU
             
             elif current_state == DIFFICULTY_SELECTION:
-                easy_button, medium_button, hard_button, back_button = draw_difficulty_selection(screen)
+                easy_button, medium_button, hard_button, back_button = difficulty_selection_scene.buttons
                 
                 if easy_button.is_clicked(event):
                     game.difficulty = "easy"
@@ -821,7 +811,7 @@ def main():
                     current_state = MODE_SELECTION
             
             elif current_state == SYMBOL_SELECTION:
-                x_button, o_button, back_button = draw_symbol_selection(screen)
+                x_button, o_button, back_button = symbol_selection_scene.buttons
                 
                 if x_button.is_clicked(event):
                     game.player_symbol = "X"
@@ -837,19 +827,19 @@ def main():
                     current_state = DIFFICULTY_SELECTION
             
             elif current_state == GAME_PLAYING:
-                reset_button, menu_button, board_x, board_y = draw_game_screen(screen, game)
+                reset_button, menu_button = game_scene.buttons
                 
                 # Handle mouse clicks on the board
                 if event.type == pygame.MOUSEBUTTONDOWN and event.button == 1:
                     mouse_x, mouse_y = event.pos
                     
                     # Check if click is inside the board
-                    if (board_x <= mouse_x <= board_x + BOARD_SIZE and
-                        board_y <= mouse_y <= board_y + BOARD_SIZE):
+                    if (BOARD_X <= mouse_x < BOARD_X + BOARD_SIZE and
+                        BOARD_Y <= mouse_y < BOARD_Y + BOARD_SIZE):
                         
                         # Convert mouse position to grid position
-                        col = (mouse_x - board_x) // CELL_SIZE
-                        row = (mouse_y - board_y) // CELL_SIZE
+                        col = (mouse_x - BOARD_X) // game.cell_size
+                        row = (mouse_y - BOARD_Y) // game.cell_size
                         
                         # Check if it's player's turn
                         if (game.game_mode == "two_player" or 
@@ -864,31 +854,26 @@ def main():
                     current_state = START_MENU
             
             elif current_state == HELP_SCREEN:
-                back_button = draw_help_screen(screen)
+                back_button = help_scene.buttons[0]
                 
                 if back_button.is_clicked(event):
                     current_state = START_MENU
         
         # Handle computer's turn in game playing state
         if current_state == GAME_PLAYING and game.game_mode == "single":
-            game.handle_computer_turn(current_time)
-        
-        # Update display
-        if current_state == START_MENU:
-            draw_start_menu(screen)
-        elif current_state == MODE_SELECTION:
-            draw_mode_selection(screen)
-        elif current_state == DIFFICULTY_SELECTION:
-            draw_difficulty_selection(screen)
-        elif current_state == SYMBOL_SELECTION:
-            draw_symbol_selection(screen)
-        elif current_state == GAME_PLAYING:
-            draw_game_screen(screen, game)
-        elif current_state == HELP_SCREEN:
-            draw_help_screen(screen)
-        
-        # Flip the display to show what we've drawn
-        pygame.display.flip()
+            if game.handle_computer_turn(current_time):
+                needs_redraw = True
+        
+        # Fades advance as the board is drawn, so keep drawing until they finish;
+        # the thinking animation also runs every frame
+        if current_state == GAME_PLAYING and (game.is_animating() or game.is_thinking()):
+            needs_redraw = True
+        
+        # Idle frames (no events, nothing animating) skip rendering and the flip
+        if needs_redraw:
+            draw_screen(screen, current_state, game)
+            pygame.display.flip()
+            needs_redraw = False
         
         # Cap the frame rate
         clock.tick(60)
@@ -0,0 +1,813 @@
+# Bitboard rules and search engines for Tic Tac Toe and its larger m,n,k variants.
+# Kept free of pygame so it can be used and timed without opening a window.
+
+import os
+import math
+import time
+import random
+import argparse
+
+# Transposition table entry flags
+EXACT = 0
+LOWER = 1
+UPPER = 2
+
+DIRECTIONS = ((0, 1), (1, 0), (1, 1), (1, -1))
+
+
+class Geometry:
+    """Cell bits and winning windows for a rows x cols board with k in a row"""
+
+    def __init__(self, rows, cols, k):
+        self.rows = rows
+        self.cols = cols
+        self.k = k
+        self.size = rows * cols
+        self.cell_bits = tuple(1 << cell for cell in range(self.size))
+        self.full_mask = (1 << self.size) - 1
+
+        windows = []
+        for row in range(rows):
+            for col in range(cols):
+                for d_row, d_col in DIRECTIONS:
+                    end_row = row + d_row * (k - 1)
+                    end_col = col + d_col * (k - 1)
+                    if 0 <= end_row < rows and 0 <= end_col < cols:
+                        windows.append(sum(
+                            self.cell_bits[(row + d_row * i) * cols + col + d_col * i] for i in range(k)
+                        ))
+        self.win_masks = tuple(windows)
+        # Only the windows through the last move need checking after it is played
+        self.windows_through = tuple(
+            tuple(window for window in windows if window & bit) for bit in self.cell_bits
+        )
+        # Cells on the most windows first: center, then corners, then edges on 3x3
+        self.move_order = tuple(sorted(range(self.size),
+                                       key=lambda cell: (-len(self.windows_through[cell]), cell)))
+
+    def winning_mask(self, mask):
+        """The first completed window in mask, or 0 if there is none"""
+        for window in self.win_masks:
+            if mask & window == window:
+                return window
+        return 0
+
+    def wins_at(self, mask, cell):
+        """The completed window through cell in mask, or 0 if there is none"""
+        for window in self.windows_through[cell]:
+            if mask & window == window:
+                return window
+        return 0
+
+
+_geometries = {}
+
+
+def get_geometry(rows=3, cols=3, k=3):
+    geometry = _geometries.get((rows, cols, k))
+    if geometry is None:
+        geometry = _geometries[(rows, cols, k)] = Geometry(rows, cols, k)
+    return geometry
+
+
+# The classic 3x3 board: cells are numbered 0-8 in row-major order, a player's
+# pieces are a 9-bit mask and the eight lines are eight mask comparisons
+CLASSIC = get_geometry(3, 3, 3)
+CELL_BITS = CLASSIC.cell_bits
+WIN_MASKS = CLASSIC.win_masks
+FULL_MASK = CLASSIC.full_mask
+MOVE_ORDER = CLASSIC.move_order
+
+# Wins score WIN minus the number of pieces on the board, so faster wins score
+# higher and the value of a position does not depend on where the search started
+WIN = 20
+INFINITY = 100
+
+
+def winning_mask(mask):
+    """The completed line in a 3x3 mask, or 0 if there is none"""
+    return CLASSIC.winning_mask(mask)
+
+
+def other_player(player):
+    return "O" if player == "X" else "X"
+
+
+class Board:
+    """rows x cols board with k in a row, stored as one bitmask per player"""
+
+    def __init__(self, rows=3, cols=3, k=3):
+        self.geometry = get_geometry(rows, cols, k)
+        self.masks = {"X": 0, "O": 0}
+
+    @property
+    def is_classic(self):
+        return self.geometry is CLASSIC
+
+    def copy(self):
+        board = Board(self.geometry.rows, self.geometry.cols, self.geometry.k)
+        board.masks = dict(self.masks)
+        return board
+
+    def cell(self, index):
+        if self.masks["X"] & self.geometry.cell_bits[index]:
+            return "X"
+        if self.masks["O"] & self.geometry.cell_bits[index]:
+            return "O"
+        return " "
+
+    def is_empty(self, index):
+        return not (self.masks["X"] | self.masks["O"]) & self.geometry.cell_bits[index]
+
+    def place(self, index, player):
+        self.masks[player] |= self.geometry.cell_bits[index]
+
+    def empty_cells(self):
+        occupied = self.masks["X"] | self.masks["O"]
+        return [cell for cell, bit in enumerate(self.geometry.cell_bits) if not occupied & bit]
+
+    def is_full(self):
+        return self.masks["X"] | self.masks["O"] == self.geometry.full_mask
+
+    def winning_line(self, player, last_move=None):
+        """Completed window for player; only the windows through last_move if given"""
+        if last_move is None:
+            return self.geometry.winning_mask(self.masks[player])
+        return self.geometry.wins_at(self.masks[player], last_move)
+
+    def wins_with(self, index, player):
+        """Whether player placing on index would complete a line"""
+        return self.geometry.wins_at(self.masks[player] | self.geometry.cell_bits[index], index) != 0
+
+    def line_cells(self, line):
+        """Cell indices of a window mask, in row-major order"""
+        return [cell for cell, bit in enumerate(self.geometry.cell_bits) if line & bit]
+
+    def rows(self):
+        """List-of-lists view of " "/"X"/"O" for drawing"""
+        cols = self.geometry.cols
+        return [[self.cell(row * cols + col) for col in range(cols)] for row in range(self.geometry.rows)]
+
+
+def _symmetry(transform):
+    """Cell permutation for one of the eight symmetries of the board"""
+    mapping = []
+    for cell in range(9):
+        row, col = transform(cell // 3, cell % 3)
+        mapping.append(row * 3 + col)
+    return tuple(mapping)
+
+
+SYMMETRIES = tuple(_symmetry(t) for t in (
+    lambda r, c: (r, c),
+    lambda r, c: (c, 2 - r),
+    lambda r, c: (2 - r, 2 - c),
+    lambda r, c: (2 - c, r),
+    lambda r, c: (r, 2 - c),
+    lambda r, c: (2 - r, c),
+    lambda r, c: (c, r),
+    lambda r, c: (2 - c, 2 - r),
+))
+INVERSE_SYMMETRIES = tuple(
+    tuple(sym.index(cell) for cell in range(9)) for sym in SYMMETRIES
+)
+
+
+def _permute_mask(mask, sym):
+    result = 0
+    for cell in range(9):
+        if mask & CELL_BITS[cell]:
+            result |= CELL_BITS[sym[cell]]
+    return result
+
+
+# SYMMETRY_MASKS[s][mask] is mask with symmetry s applied
+SYMMETRY_MASKS = tuple(
+    tuple(_permute_mask(mask, sym) for mask in range(1 << 9)) for sym in SYMMETRIES
+)
+
+
+class AlphaBetaEngine:
+    """Alpha-beta negamax with move ordering and a symmetry-reduced transposition table"""
+
+    def __init__(self):
+        # Canonical (mover, opponent) masks -> (flag, value, best move in canonical cells).
+        # Values are independent of the search root, so the table is kept
+        # between moves and between games.
+        self.table = {}
+        self.nodes = 0
+        self.best_score = 0
+
+    def best_move(self, board, player):
+        """Return the optimal cell index for player to move on board"""
+        me = board.masks[player]
+        opponent = board.masks[other_player(player)]
+        self.nodes = 0
+        best_score = -INFINITY
+        best = None
+        alpha = -INFINITY
+        for move in self.ordered_moves(me | opponent, None):
+            score = -self.search(opponent, me | CELL_BITS[move], -INFINITY, -alpha)
+            if score > best_score:
+                best_score = score
+                best = move
+            alpha = max(alpha, score)
+        self.best_score = best_score
+        return best
+
+    def search(self, me, opponent, alpha, beta):
+        """Negamax value of the position for the player to move, whose pieces are me"""
+        self.nodes += 1
+        occupied = me | opponent
+        pieces = occupied.bit_count()
+
+        # Only the player who just moved can have completed a line
+        if winning_mask(opponent):
+            return pieces - WIN
+        if occupied == FULL_MASK:
+            return 0
+
+        key, sym = self.canonical(me, opponent)
+        tt_move = None
+        entry = self.table.get(key)
+        if entry is not None:
+            flag, value, canonical_move = entry
+            if flag == EXACT:
+                return value
+            if flag == LOWER and value >= beta:
+                return value
+            if flag == UPPER and value <= alpha:
+                return value
+            tt_move = INVERSE_SYMMETRIES[sym][canonical_move]
+
+        alpha_orig = alpha
+        best_score = -INFINITY
+        best = None
+        for move in self.ordered_moves(occupied, tt_move):
+            score = -self.search(opponent, me | CELL_BITS[move], -beta, -alpha)
+            if score > best_score:
+                best_score = score
+                best = move
+            if best_score > alpha:
+                alpha = best_score
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        self.table[key] = (flag, best_score, SYMMETRIES[sym][best])
+        return best_score
+
+    def ordered_moves(self, occupied, first):
+        """Empty cells, with the transposition table's best move (if any) first"""
+        moves = [cell for cell in MOVE_ORDER if not occupied & CELL_BITS[cell] and cell != first]
+        if first is not None:
+            moves.insert(0, first)
+        return moves
+
+    def canonical(self, me, opponent):
+        """Smallest packed key over the eight symmetries, and which symmetry gave it"""
+        best_key = None
+        best_sym = 0
+        for index, masks in enumerate(SYMMETRY_MASKS):
+            key = masks[me] << 9 | masks[opponent]
+            if best_key is None or key < best_key:
+                best_key = key
+                best_sym = index
+        return best_key, best_sym
+
+
+# Larger boards cannot be searched to the end, so positions are scored by how
+# many open windows each side is building: WINDOW_WEIGHTS[n] per window holding
+# n of a player's pieces and none of the opponent's
+WINDOW_WEIGHTS = (0, 1, 10, 100, 1000, 10000, 100000)
+WIN_SCORE = 10 ** 7
+MATE_THRESHOLD = WIN_SCORE - 1000
+TIME_CHECK_INTERVAL = 1024  # nodes between clock reads
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the per-move time budget runs out"""
+
+
+class IterativeDeepeningEngine:
+    """Time-bounded iterative-deepening alpha-beta for any rows x cols x k board"""
+
+    def __init__(self, time_budget=0.5):
+        self.time_budget = time_budget
+        # (mover, opponent) masks -> (depth, flag, value, best move)
+        self.table = {}
+        self.nodes = 0
+        self.depth_reached = 0
+        self.deadline = 0.0
+
+    def clear(self):
+        self.table.clear()
+
+    def best_move(self, board, player, time_budget=None):
+        """Best cell for player found within the time budget (seconds)"""
+        geometry = board.geometry
+        me = board.masks[player]
+        opponent = board.masks[other_player(player)]
+        occupied = me | opponent
+        moves = [cell for cell in geometry.move_order if not occupied & geometry.cell_bits[cell]]
+        self.nodes = 0
+        self.depth_reached = 0
+        if not moves:
+            return None
+
+        # Winning now or blocking a win now needs no search
+        for cell in moves:
+            if geometry.wins_at(me | geometry.cell_bits[cell], cell):
+                return cell
+        for cell in moves:
+            if geometry.wins_at(opponent | geometry.cell_bits[cell], cell):
+                return cell
+
+        budget = self.time_budget if time_budget is None else time_budget
+        self.deadline = time.perf_counter() + budget
+        best = moves[0]
+        for depth in range(1, len(moves) + 1):
+            try:
+                score, move = self.search_root(geometry, me, opponent, moves, depth)
+            except SearchTimeout:
+                break
+            best = move
+            self.depth_reached = depth
+            # Search the previous best first at the next depth
+            moves.remove(move)
+            moves.insert(0, move)
+            if abs(score) >= MATE_THRESHOLD:
+                break
+        return best
+
+    def search_root(self, geometry, me, opponent, moves, depth):
+        alpha = -WIN_SCORE - 1
+        best = moves[0]
+        for move in moves:
+            score = -self.search(geometry, opponent, me | geometry.cell_bits[move], move,
+                                 depth - 1, -WIN_SCORE - 1, -alpha, 1)
+            if score > alpha:
+                alpha = score
+                best = move
+        return alpha, best
+
+    def search(self, geometry, me, opponent, last_move, depth, alpha, beta, ply):
+        """Negamax value for the player to move (me) after the opponent played last_move"""
+        self.nodes += 1
+        if self.nodes % TIME_CHECK_INTERVAL == 0 and time.perf_counter() > self.deadline:
+            raise SearchTimeout()
+
+        if geometry.wins_at(opponent, last_move):
+            return ply - WIN_SCORE
+        occupied = me | opponent
+        if occupied == geometry.full_mask:
+            return 0
+        if depth == 0:
+            return self.evaluate(geometry, me, opponent)
+
+        key = (me, opponent)
+        tt_move = None
+        entry = self.table.get(key)
+        if entry is not None:
+            entry_depth, flag, value, tt_move = entry
+            if entry_depth >= depth:
+                # Stored win/loss scores are relative to the node, not the root
+                if value >= MATE_THRESHOLD:
+                    value -= ply
+                elif value <= -MATE_THRESHOLD:
+                    value += ply
+                if flag == EXACT:
+                    return value
+                if flag == LOWER and value >= beta:
+                    return value
+                if flag == UPPER and value <= alpha:
+                    return value
+
+        alpha_orig = alpha
+        best_score = -WIN_SCORE - 1
+        best = None
+        for move in self.ordered_moves(geometry, occupied, tt_move):
+            score = -self.search(geometry, opponent, me | geometry.cell_bits[move], move,
+                                 depth - 1, -beta, -alpha, ply + 1)
+            if score > best_score:
+                best_score = score
+                best = move
+            if best_score > alpha:
+                alpha = best_score
+            if alpha >= beta:
+                break
+
+        if best_score <= alpha_orig:
+            flag = UPPER
+        elif best_score >= beta:
+            flag = LOWER
+        else:
+            flag = EXACT
+        stored = best_score
+        if stored >= MATE_THRESHOLD:
+            stored += ply
+        elif stored <= -MATE_THRESHOLD:
+            stored -= ply
+        self.table[key] = (depth, flag, stored, best)
+        return best_score
+
+    def ordered_moves(self, geometry, occupied, first):
+        moves = [cell for cell in geometry.move_order
+                 if not occupied & geometry.cell_bits[cell] and cell != first]
+        if first is not None:
+            moves.insert(0, first)
+        return moves
+
+    def evaluate(self, geometry, me, opponent):
+        """Heuristic score of the open windows, from the point of view of me"""
+        score = 0
+        for window in geometry.win_masks:
+            mine = me & window
+            theirs = opponent & window
+            if mine and not theirs:
+                score += WINDOW_WEIGHTS[mine.bit_count()]
+            elif theirs and not mine:
+                score -= WINDOW_WEIGHTS[theirs.bit_count()]
+        return score
+
+
+class MCTSNode:
+    """Search tree node; me is the mask of the player to move here"""
+
+    __slots__ = ("me", "opponent", "move", "parent", "children", "untried", "visits", "wins", "terminal")
+
+    def __init__(self, geometry, me, opponent, move=None, parent=None):
+        self.me = me
+        self.opponent = opponent
+        self.move = move
+        self.parent = parent
+        self.children = []
+        self.visits = 0
+        # Playout results for the player who moved into this node: 1 win, 0.5 draw
+        self.wins = 0.0
+        occupied = me | opponent
+        if move is not None and geometry.wins_at(opponent, move):
+            self.terminal = True
+        else:
+            self.terminal = occupied == geometry.full_mask
+        if self.terminal:
+            self.untried = []
+        else:
+            # Popped from the end, so the best-placed cells are expanded first
+            self.untried = [cell for cell in reversed(geometry.move_order)
+                            if not occupied & geometry.cell_bits[cell]]
+
+    def find(self, me, opponent, depth):
+        """Descendant at most depth plies down with the given masks, or None"""
+        if self.me == me and self.opponent == opponent:
+            return self
+        if depth:
+            for child in self.children:
+                node = child.find(me, opponent, depth - 1)
+                if node is not None:
+                    return node
+        return None
+
+
+class MCTSEngine:
+    """Monte Carlo tree search with UCT selection and random bitboard playouts
+
+    Strength is set by playouts (iterations per move) and/or time_budget
+    (seconds per move). The tree under the chosen move is kept, so the
+    playouts spent on the opponent's reply are reused on the next turn.
+    """
+
+    def __init__(self, playouts=1000, time_budget=None, exploration=1.4, seed=None):
+        self.playouts = playouts
+        self.time_budget = time_budget
+        self.exploration = exploration
+        self.rng = random.Random(seed)
+        self.root = None
+        self.geometry = None
+        self.iterations = 0
+        self.reused_visits = 0
+
+    def reset(self):
+        self.root = None
+
+    def best_move(self, board, player, playouts=None):
+        """Most visited cell for player after the playout or time budget is spent"""
+        geometry = board.geometry
+        me = board.masks[player]
+        opponent = board.masks[other_player(player)]
+        root = None
+        if self.root is not None and self.geometry is geometry:
+            # Our last move and the opponent's reply are at most two plies down
+            root = self.root.find(me, opponent, 2)
+        if root is None:
+            root = MCTSNode(geometry, me, opponent)
+        root.parent = None
+        self.root = root
+        self.geometry = geometry
+        self.reused_visits = root.visits
+        if root.terminal:
+            return None
+
+        budget = self.playouts if playouts is None else playouts
+        deadline = None if self.time_budget is None else time.perf_counter() + self.time_budget
+        self.iterations = 0
+        while budget is None or self.iterations < budget:
+            if deadline is not None and self.iterations % 16 == 0 and time.perf_counter() > deadline:
+                break
+            self.iterate(geometry, root)
+            self.iterations += 1
+
+        best = max(root.children, key=lambda child: child.visits)
+        # Keep only the chosen branch for the next turn
+        self.root = best
+        best.parent = None
+        return best.move
+
+    def iterate(self, geometry, root):
+        """One select / expand / playout / backpropagate pass"""
+        node = root
+        while not node.untried and not node.terminal:
+            node = self.select(node)
+        if node.untried:
+            move = node.untried.pop()
+            child = MCTSNode(geometry, node.opponent, node.me | geometry.cell_bits[move], move, node)
+            node.children.append(child)
+            node = child
+
+        if node.terminal:
+            # A finished game: whoever moved into the node won unless it is a draw
+            result = 1.0 if node.move is not None and geometry.wins_at(node.opponent, node.move) else 0.5
+        else:
+            result = 1.0 - self.playout(geometry, node.me, node.opponent)
+
+        while node is not None:
+            node.visits += 1
+            node.wins += result
+            result = 1.0 - result
+            node = node.parent
+
+    def select(self, node):
+        log_visits = math.log(node.visits)
+        exploration = self.exploration
+        best = None
+        best_value = -1.0
+        for child in node.children:
+            value = child.wins / child.visits + exploration * math.sqrt(log_visits / child.visits)
+            if value > best_value:
+                best_value = value
+                best = child
+        return best
+
+    def playout(self, geometry, me, opponent):
+        """Random game to the end; 1 if the player to move (me) wins, 0.5 for a draw"""
+        occupied = me | opponent
+        cell_bits = geometry.cell_bits
+        cells = [cell for cell in range(geometry.size) if not occupied & cell_bits[cell]]
+        self.rng.shuffle(cells)
+        masks = [me, opponent]
+        turn = 0
+        for cell in cells:
+            mask = masks[turn] | cell_bits[cell]
+            masks[turn] = mask
+            if geometry.wins_at(mask, cell):
+                return 1.0 if turn == 0 else 0.0
+            turn ^= 1
+        return 0.5
+
+
+# Precomputed solution table: one byte per base-3 board index, holding the
+# best move in the low nibble and the result for the side to move in the high one
+SOLUTION_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "ttt_solutions.bin")
+SOLUTION_MAGIC = b"TTT1"
+SOLUTION_SIZE = 3 ** 9
+NO_MOVE = 0xFF
+LOSS = 0
+DRAW = 1
+WIN_RESULT = 2
+
+# TERNARY[mask] is the base-3 weight of the cells in mask
+TERNARY = tuple(
+    sum(3 ** cell for cell in range(9) if mask & CELL_BITS[cell]) for mask in range(1 << 9)
+)
+
+
+def position_index(board):
+    """Base-3 index of a board: each cell is 0 for empty, 1 for X and 2 for O"""
+    return TERNARY[board.masks["X"]] + 2 * TERNARY[board.masks["O"]]
+
+
+def player_to_move(board):
+    """X moves whenever both players have placed the same number of pieces"""
+    return "X" if board.masks["X"].bit_count() == board.masks["O"].bit_count() else "O"
+
+
+def build_solution_table(path=SOLUTION_FILE):
+    """Solve every reachable position once and write the packed table to path"""
+    engine = AlphaBetaEngine()
+    table = bytearray([NO_MOVE]) * SOLUTION_SIZE
+    seen = set()
+    stack = [Board()]
+    while stack:
+        board = stack.pop()
+        index = position_index(board)
+        if index in seen:
+            continue
+        seen.add(index)
+        if board.winning_line("X") or board.winning_line("O") or board.is_full():
+            continue
+        player = player_to_move(board)
+        move = engine.best_move(board, player)
+        if engine.best_score > 0:
+            result = WIN_RESULT
+        elif engine.best_score < 0:
+            result = LOSS
+        else:
+            result = DRAW
+        table[index] = result << 4 | move
+        for cell in board.empty_cells():
+            child = board.copy()
+            child.place(cell, player)
+            stack.append(child)
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(SOLUTION_MAGIC)
+        f.write(table)
+    os.replace(tmp_path, path)
+    return len(seen)
+
+
+class SolutionTable:
+    """Optimal moves for every reachable 3x3 position, loaded from the packed file"""
+
+    def __init__(self, data):
+        self.data = data
+
+    @classmethod
+    def load(cls, path=SOLUTION_FILE):
+        """Return the table stored at path, or None if it is missing or malformed"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        if len(data) != len(SOLUTION_MAGIC) + SOLUTION_SIZE or not data.startswith(SOLUTION_MAGIC):
+            return None
+        return cls(data[len(SOLUTION_MAGIC):])
+
+    def lookup(self, board):
+        """(best cell, result for the side to move), or None for finished positions"""
+        entry = self.data[position_index(board)]
+        if entry == NO_MOVE:
+            return None
+        return entry & 0x0F, entry >> 4
+
+    def best_move(self, board):
+        entry = self.lookup(board)
+        return None if entry is None else entry[0]
+
+
+# Computer players. Each has choose(board, player) returning a cell index (or
+# None when the board is full), reset() called before every new game, and
+# nodes: the positions or playouts the last choice examined.
+
+# Seconds the hard player may search on boards larger than 3x3
+HARD_TIME_BUDGET = 0.5
+
+# Easy and medium play Monte Carlo tree search; strength is the number of
+# random playouts per move
+MCTS_PLAYOUTS = {"easy": 15, "medium": 300}
+
+
+class RandomPlayer:
+    """Uniformly random empty cell"""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.nodes = 0
+
+    def reset(self):
+        pass
+
+    def choose(self, board, player):
+        empty_cells = board.empty_cells()
+        return self.rng.choice(empty_cells) if empty_cells else None
+
+
+class RulePlayer:
+    """Win, else block, else take a center, a corner or any other cell"""
+
+    def __init__(self, seed=None):
+        self.rng = random.Random(seed)
+        self.nodes = 0
+
+    def reset(self):
+        pass
+
+    def choose(self, board, player):
+        empty_cells = board.empty_cells()
+        opponent = other_player(player)
+        for cell in empty_cells:
+            if board.wins_with(cell, player):
+                return cell
+        for cell in empty_cells:
+            if board.wins_with(cell, opponent):
+                return cell
+
+        rows, cols = board.geometry.rows, board.geometry.cols
+        # All four middle cells on even-sized boards
+        centers = [row * cols + col for row in {(rows - 1) // 2, rows // 2} for col in {(cols - 1) // 2, cols // 2}]
+        corners = [0, cols - 1, (rows - 1) * cols, rows * cols - 1]
+        for group in (centers, corners):
+            group = [cell for cell in group if board.is_empty(cell)]
+            if group:
+                return self.rng.choice(group)
+        return self.rng.choice(empty_cells) if empty_cells else None
+
+
+class MCTSPlayer:
+    """Monte Carlo tree search with a fixed number of playouts per move"""
+
+    def __init__(self, playouts, seed=None):
+        self.engine = MCTSEngine(playouts, seed=seed)
+        self.nodes = 0
+
+    def reset(self):
+        self.engine.reset()
+
+    def choose(self, board, player):
+        move = self.engine.best_move(board, player)
+        self.nodes = self.engine.iterations
+        return move
+
+
+class PerfectPlayer:
+    """Solution table or alpha-beta on 3x3, time-bounded deepening search on larger boards"""
+
+    def __init__(self, use_table=True, time_budget=HARD_TIME_BUDGET):
+        self.solutions = SolutionTable.load() if use_table else None
+        self.engine = AlphaBetaEngine()
+        self.deep_engine = IterativeDeepeningEngine(time_budget)
+        self.geometry = None
+        self.nodes = 0
+
+    def reset(self):
+        # Start each game with an empty transposition table so it cannot grow
+        # without bound over a long session
+        self.deep_engine.clear()
+
+    def choose(self, board, player):
+        if not board.is_classic:
+            # Transposition table keys are bare masks, so they only hold for one geometry
+            if board.geometry is not self.geometry:
+                self.deep_engine.clear()
+                self.geometry = board.geometry
+            move = self.deep_engine.best_move(board, player)
+            self.nodes = self.deep_engine.nodes
+        elif self.solutions is not None:
+            move = self.solutions.best_move(board)
+            self.nodes = 0
+        else:
+            move = self.engine.best_move(board, player)
+            self.nodes = self.engine.nodes
+        return move
+
+
+PLAYER_NAMES = ("random", "rules", "easy", "medium", "hard", "alphabeta", "mcts:N")
+
+
+def make_player(name, seed=None):
+    """Player for a name in PLAYER_NAMES; mcts:N plays N playouts per move"""
+    if name == "random":
+        return RandomPlayer(seed)
+    if name == "rules":
+        return RulePlayer(seed)
+    if name in MCTS_PLAYOUTS:
+        return MCTSPlayer(MCTS_PLAYOUTS[name], seed)
+    if name.startswith("mcts:") and name[5:].isdigit():
+        playouts = int(name[5:])
+        if playouts < 1:
+            raise ValueError(f"player {name!r} needs at least one playout per move")
+        return MCTSPlayer(playouts, seed)
+    if name == "hard":
+        return PerfectPlayer()
+    if name == "alphabeta":
+        return PerfectPlayer(use_table=False)
+    raise ValueError(f"unknown player {name!r}, expected one of {', '.join(PLAYER_NAMES)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Tic Tac Toe engine tools")
+    parser.add_argument("--build-table", nargs="?", const=SOLUTION_FILE, metavar="FILE",
+                        help=f"solve every position and write the lookup table (default: {SOLUTION_FILE})")
+    args = parser.parse_args()
+    if args.build_table:
+        count = build_solution_table(args.build_table)
+        print(f"Solved {count} positions into {args.build_table}")
+    else:
+        parser.print_help()
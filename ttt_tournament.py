@@ -0,0 +1,124 @@
+# Headless Tic Tac Toe tournament: plays two computer players against each other
+# in worker processes and reports results, move latency and search effort.
+#
+#   python ttt_tournament.py random hard --games 200
+#   python ttt_tournament.py easy medium --board 5 --k 4 --workers 4 --json
+
+import sys
+import json
+import time
+import argparse
+from multiprocessing import Pool
+
+from tictaktoe_engine import Board, PLAYER_NAMES, make_player, other_player
+
+
+def play_game(job):
+    """Play one game; returns (winner index or None, per-player move stats)
+
+    Player 0 takes X in even-numbered games and O in odd ones, so neither side
+    always moves first.
+    """
+    names, size, k, seed, game_index = job
+    players = [make_player(name, seed + game_index * 2 + i) for i, name in enumerate(names)]
+    for player in players:
+        player.reset()
+    symbols = ("X", "O") if game_index % 2 == 0 else ("O", "X")
+    # Per player: [moves, seconds thinking, nodes]
+    stats = [[0, 0.0, 0], [0, 0.0, 0]]
+
+    board = Board(size, size, k)
+    symbol = "X"
+    while True:
+        index = symbols.index(symbol)
+        start = time.perf_counter()
+        move = players[index].choose(board, symbol)
+        stats[index][0] += 1
+        stats[index][1] += time.perf_counter() - start
+        stats[index][2] += players[index].nodes
+        board.place(move, symbol)
+        if board.winning_line(symbol, move):
+            return index, stats
+        if board.is_full():
+            return None, stats
+        symbol = other_player(symbol)
+
+
+def run_tournament(names, games, size=3, k=3, workers=None, seed=0):
+    """Play games between the two named players and return a summary dict"""
+    jobs = [(names, size, k, seed, game_index) for game_index in range(games)]
+    wins = [0, 0]
+    draws = 0
+    totals = [[0, 0.0, 0], [0, 0.0, 0]]
+
+    start = time.perf_counter()
+    with Pool(workers) as pool:
+        for winner, stats in pool.imap_unordered(play_game, jobs, chunksize=max(1, games // 64)):
+            if winner is None:
+                draws += 1
+            else:
+                wins[winner] += 1
+            for total, game_stats in zip(totals, stats):
+                for i, value in enumerate(game_stats):
+                    total[i] += value
+    elapsed = time.perf_counter() - start
+
+    players = []
+    for index, name in enumerate(names):
+        moves, seconds, nodes = totals[index]
+        players.append({
+            "name": name,
+            "wins": wins[index],
+            "draws": draws,
+            "losses": wins[1 - index],
+            "moves": moves,
+            "ms_per_move": seconds * 1000 / moves if moves else 0.0,
+            "nodes_per_move": nodes / moves if moves else 0.0,
+        })
+    return {"board": f"{size}x{size}", "k": k, "games": games, "seconds": elapsed, "players": players}
+
+
+def print_report(summary):
+    games = summary["games"]
+    print(f"{games} games on {summary['board']}, {summary['k']} in a row, in {summary['seconds']:.2f}s")
+    print(f"{'player':<12}{'win%':>8}{'draw%':>8}{'loss%':>8}{'ms/move':>10}{'nodes/move':>12}")
+    for player in summary["players"]:
+        print(f"{player['name']:<12}"
+              f"{100 * player['wins'] / games:>8.1f}"
+              f"{100 * player['draws'] / games:>8.1f}"
+              f"{100 * player['losses'] / games:>8.1f}"
+              f"{player['ms_per_move']:>10.3f}"
+              f"{player['nodes_per_move']:>12.1f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Play Tic Tac Toe computer players against each other")
+    parser.add_argument("players", nargs=2, metavar="PLAYER",
+                        help=f"player names: {', '.join(PLAYER_NAMES)}")
+    parser.add_argument("--games", type=int, default=100, help="number of games (default: 100)")
+    parser.add_argument("--board", type=int, default=3, help="cells per side (default: 3)")
+    parser.add_argument("--k", type=int, default=None, help="marks in a row to win (default: board size, at most 4)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    parser.add_argument("--seed", type=int, default=0, help="base seed for the random players")
+    parser.add_argument("--json", action="store_true", help="print the summary as JSON")
+    args = parser.parse_args()
+
+    if args.games < 1:
+        parser.error(f"--games must be at least 1, got {args.games}")
+    k = args.k if args.k is not None else min(args.board, 4)
+    try:
+        for name in args.players:
+            make_player(name)
+    except ValueError as e:
+        parser.error(str(e))
+
+    summary = run_tournament(tuple(args.players), args.games, args.board, k, args.workers, args.seed)
+    if args.json:
+        json.dump(summary, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(summary)
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,341 @@
 import tkinter as tk
 from tkinter import messagebox, ttk
+import os
+import json
 import random
 import math
 import time
 
+from water_jug_solver import (FILL, EMPTY, MOVES, LITRES, HintTable, JugSystem,
+                              PuzzleCatalogue, can_solve, describe_action, describe_move, is_solvable,
+                              litres_moved, solve)
+
+# Most jugs the capacity entries and stats panel have room for
+MAX_JUGS = 4
+
+# Preset (capacities, goal) for each jug count and difficulty
+PRESETS = {
+    2: {"Easy": ((5, 3), 4), "Medium": ((7, 3), 2), "Hard": ((11, 6), 8)},
+    3: {"Easy": ((8, 5, 3), 4), "Medium": ((10, 7, 3), 5), "Hard": ((14, 9, 5), 7)},
+    4: {"Easy": ((10, 7, 4, 3), 5), "Medium": ((14, 9, 5, 4), 7), "Hard": ((15, 11, 7, 4), 13)},
+}
+
+# Optimal move counts of the two-jug catalogue puzzles served at each difficulty
+CATALOGUE_MOVES = {"Easy": (4, 6), "Medium": (8, 12), "Hard": (14, 24)}
+
+# Scoring options shown in the combobox and the solver cost mode behind each
+COST_MODES = {"Moves": MOVES, "Litres poured": LITRES}
+
+# Most packed states a hint table is built for; at this size the reverse
+# search still takes well under a second
+HINT_TABLE_STATE_LIMIT = 50_000
+
+# Animation timing at normal speed, in milliseconds
+FRAME_MS = 16
+POUR_MS = 500
+AUTO_SOLVE_PAUSE_MS = 500
+
+# Animation speed options and the rate multiplier behind each
+ANIMATION_SPEEDS = {"Slow": 0.5, "Normal": 1.0, "Fast": 2.0, "Instant": math.inf}
+
+
+class WaterAnimator:
+    """Eases jug water levels between states on one shared after() timer
+    
+    Each active tween moves one jug from the level it showed when the tween
+    started to a target level. A single frame callback advances every tween
+    by the real time since the last frame, so dropped frames never slow the
+    animation, and a new target simply restarts the jug from where its water
+    is now.
+    """
+    
+    def __init__(self, root, draw_water):
+        self.root = root
+        self.draw_water = draw_water
+        self.speed = 1.0
+        self.amounts = []
+        self.tweens = {}  # jug -> [start amount, end amount, progress from 0 to 1]
+        self.timer_id = None
+        self.last_frame = 0
+        self.on_done = None
+    
+    def reset(self, amounts):
+        """Show amounts as they are, dropping any running tweens"""
+        self.cancel()
+        self.amounts = list(amounts)
+    
+    def cancel(self):
+        """Stop every tween where it is"""
+        if self.timer_id is not None:
+            self.root.after_cancel(self.timer_id)
+            self.timer_id = None
+        self.tweens.clear()
+        self.on_done = None
+    
+    def animate_to(self, amounts, on_done=None):
+        """Move each jug from the level it shows now to amounts, then call on_done"""
+        self.on_done = on_done
+        for jug, (shown, target) in enumerate(zip(self.amounts, amounts)):
+            if shown != target:
+                self.tweens[jug] = [shown, target, 0.0]
+            else:
+                self.tweens.pop(jug, None)
+        if self.timer_id is None:
+            self.last_frame = time.perf_counter()
+            self.frame()
+    
+    def frame(self):
+        """Advance every tween to the current time and schedule the next frame"""
+        now = time.perf_counter()
+        if math.isinf(self.speed):
+            step = 1.0
+        else:
+            step = (now - self.last_frame) * 1000 * self.speed / POUR_MS
+        self.last_frame = now
+        
+        for jug, tween in list(self.tweens.items()):
+            start, end, progress = tween
+            progress = min(1.0, progress + step)
+            tween[2] = progress
+            if progress >= 1.0:
+                self.amounts[jug] = end
+                del self.tweens[jug]
+            else:
+                # Smoothstep easing: the pour starts and finishes gently
+                self.amounts[jug] = start + (end - start) * progress * progress * (3 - 2 * progress)
+            self.draw_water(jug, self.amounts[jug])
+        
+        if self.tweens:
+            self.timer_id = self.root.after(FRAME_MS, self.frame)
+        else:
+            self.timer_id = None
+            on_done, self.on_done = self.on_done, None
+            if on_done is not None:
+                on_done()
+
+
+class GameClock:
+    """Play time measured with time.perf_counter
+    
+    The monotonic clock cannot be moved by wall-clock changes, and time only
+    accumulates while the clock runs, so pauses are left out of results.
+    """
+    
+    def __init__(self):
+        self.accumulated = 0.0
+        self.started = None
+    
+    @property
+    def running(self):
+        return self.started is not None
+    
+    def start(self):
+        """Start again from zero"""
+        self.accumulated = 0.0
+        self.started = time.perf_counter()
+    
+    def pause(self):
+        if self.started is not None:
+            self.accumulated += time.perf_counter() - self.started
+            self.started = None
+    
+    def resume(self):
+        if self.started is None:
+            self.started = time.perf_counter()
+    
+    def elapsed(self):
+        """Seconds of play so far, with sub-second precision"""
+        if self.started is None:
+            return self.accumulated
+        return self.accumulated + time.perf_counter() - self.started
+
+
+# Score log: one JSON record per finished game, appended to a per-user file
+# that does not depend on the directory the game was launched from
+DATA_DIR = os.environ.get(
+    "WATER_JUG_DATA_DIR",
+    os.path.join(os.environ.get("XDG_DATA_HOME", os.path.join(os.path.expanduser("~"), ".local", "share")),
+                 "gaming-hub")
+)
+SCORE_LOG_FILE = os.path.join(DATA_DIR, "water_jug_scores.jsonl")
+
+# Best-score file of older versions, read once into a new log
+LEGACY_SCORE_FILE = "water_jug_scores.txt"
+
+# Once the log holds COMPACT_RECORDS records it is compacted on exit to the
+# latest COMPACT_KEEP records and the best of every puzzle. Catalogue puzzles
+# rarely repeat, so the best records alone can come close to the threshold;
+# the rewrite is skipped unless it drops at least COMPACT_MIN_DROP records.
+COMPACT_RECORDS = 10000
+COMPACT_KEEP = 5000
+COMPACT_MIN_DROP = 1000
+
+
+def puzzle_key(capacities, goal, mode):
+    """Index key for one puzzle under one scoring mode, e.g. "5x3/4/moves" """
+    return f"{'x'.join(map(str, capacities))}/{goal}/{mode}"
+
+
+class ScoreLog:
+    """Append-only history of finished games, indexed by puzzle
+    
+    Each game is one JSON line written with a single append and fsync, so a
+    crash can at worst leave a torn last line, which loading skips. The file
+    is only read when a score is first asked for; that one pass keeps byte
+    offsets and the best score per puzzle, and full records are read back
+    on demand.
+    """
+    
+    def __init__(self, path=SCORE_LOG_FILE):
+        self.path = path
+        self.offsets = None  # puzzle key -> byte offsets of its records
+        self.bests = {}
+        self.records = 0
+        self.corrupt = 0
+        self.error = None  # OSError that stopped loading part way, if any
+    
+    def load(self):
+        """Index the log if that has not been done yet"""
+        if self.offsets is not None:
+            return
+        self.offsets = {}
+        try:
+            with open(self.path, "rb") as f:
+                offset = 0
+                for line in f:
+                    try:
+                        record = json.loads(line)
+                        self._index(record, offset)
+                    except (ValueError, KeyError, TypeError):
+                        self.corrupt += 1
+                    offset += len(line)
+        except FileNotFoundError:
+            pass
+        except OSError as e:
+            self.error = e
+    
+    @staticmethod
+    def _score(record):
+        """A record's score under its own scoring mode; raises KeyError or TypeError if it has none"""
+        score = record[record["mode"]]
+        if isinstance(score, bool) or not isinstance(score, (int, float)):
+            raise TypeError(f"score {score!r} is not a number")
+        return score
+    
+    def _index(self, record, offset):
+        key = record["puzzle"]
+        score = self._score(record)
+        self.offsets.setdefault(key, []).append(offset)
+        if score < self.bests.get(key, float('inf')):
+            self.bests[key] = score
+        self.records += 1
+    
+    def best(self, key):
+        """Best score recorded for a puzzle key, or None"""
+        self.load()
+        return self.bests.get(key)
+    
+    def history(self, key):
+        """Every record for a puzzle key, oldest first; empty until the log exists"""
+        self.load()
+        records = []
+        try:
+            with open(self.path, "rb") as f:
+                for offset in self.offsets.get(key, []):
+                    f.seek(offset)
+                    records.append(json.loads(f.readline()))
+        except FileNotFoundError:
+            return []
+        return records
+    
+    def append(self, record):
+        """Durably add one record; raises OSError if it cannot be written"""
+        self.load()
+        os.makedirs(os.path.dirname(self.path), exist_ok=True)
+        line = json.dumps(record, separators=(",", ":")).encode() + b"\n"
+        with open(self.path, "a+b") as f:
+            # Start on a fresh line if a crash left the last one torn
+            f.seek(0, os.SEEK_END)
+            offset = f.tell()
+            if offset:
+                f.seek(offset - 1)
+                if f.read(1) != b"\n":
+                    line = b"\n" + line
+                    offset += 1
+            f.write(line)
+            f.flush()
+            os.fsync(f.fileno())
+        self._index(record, offset)
+    
+    def import_legacy(self, path=LEGACY_SCORE_FILE):
+        """Turn an old "difficulty:score" file into records, if there is no log yet
+        
+        Old scores were kept per difficulty of the fixed presets, so each
+        maps back to the preset puzzle it was set on.
+        """
+        if os.path.exists(self.path):
+            return
+        try:
+            with open(path, "r") as f:
+                lines = f.read().splitlines()
+        except OSError:
+            return
+        for line in lines:
+            name, _, score = line.partition(":")
+            words = name.split()
+            count = int(words[1]) if len(words) > 2 and words[1].isdigit() else 2
+            mode = LITRES if words and words[-1] == LITRES else MOVES
+            if not words or words[0] not in PRESETS[2] or count not in PRESETS or not score.isdigit():
+                continue
+            capacities, goal = PRESETS[count][words[0]]
+            self.append({"puzzle": puzzle_key(capacities, goal, mode), "mode": mode,
+                         "capacities": list(capacities), "goal": goal, "difficulty": words[0],
+                         mode: int(score), "imported": True})
+    
+    def compact(self, keep=COMPACT_KEEP, min_drop=0):
+        """Atomically rewrite the log with its latest keep records and the best of each puzzle
+        
+        Nothing is rewritten unless that drops at least min_drop records or
+        clears out unreadable lines. Returns the number of records dropped.
+        """
+        self.load()
+        lines = {}
+        bests = {}  # puzzle key -> (best score, offset of the first record with it)
+        with open(self.path, "rb") as f:
+            for key, offsets in self.offsets.items():
+                for offset in offsets:
+                    f.seek(offset)
+                    line = f.readline()
+                    try:
+                        score = self._score(json.loads(line))
+                    except (ValueError, KeyError, TypeError):
+                        continue  # Changed since it was indexed; not worth keeping
+                    lines[offset] = line
+                    if key not in bests or score < bests[key][0]:
+                        bests[key] = (score, offset)
+        latest = sorted(lines)[-keep:] if keep > 0 else []
+        kept = sorted(set(latest).union(offset for _, offset in bests.values()))
+        dropped = self.records - len(kept)
+        if dropped < min_drop and not self.corrupt:
+            return 0
+        
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "wb") as f:
+            for offset in kept:
+                line = lines[offset]
+                f.write(line if line.endswith(b"\n") else line + b"\n")
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        
+        # Offsets moved; index again on next use
+        self.offsets = None
+        self.bests = {}
+        self.records = 0
+        self.corrupt = 0
+        return dropped
+
+
 class WaterJugGame:
     def __init__(self, root):
         self.root = root
@@ -15,21 +347,40 @@ class WaterJugGame:
         self.root.configure(bg="#e8f4f8")
         
         # Game state
-        self.jug1_capacity = 0
-        self.jug2_capacity = 0
+        self.capacities = (0, 0)
+        self.current = [0, 0]
+        self.system = JugSystem(self.capacities)
         self.goal_amount = 0
-        self.jug1_current = 0
-        self.jug2_current = 0
         self.moves_count = 0
+        self.litres_poured = 0
+        self.cost_mode = MOVES
         self.game_active = False
+        self.puzzle_solved = False  # logged; only Restart or New Game carry on
+        self.assisted = False  # auto-solve has run on this puzzle, so results are logged as auto
         self.solution_path = []
+        self.hint_table = None
         self.current_hint_index = 0
         self.difficulty_level = tk.StringVar(value="Easy")
-        self.time_start = 0
+        self.jug_count = tk.StringVar(value="2")
+        self.scoring = tk.StringVar(value="Moves")
+        self.jug_items = []
+        self.goal_item = None
+        self.item_capacities = None
+        self.layout = None
+        self.canvas_size = None
+        self.resize_id = None
+        self.level_texts = []
+        self.auto_solving = False
+        self.auto_solve_id = None
+        self.animation_speed = tk.StringVar(value="Normal")
+        self.clock = GameClock()
         self.timer_running = False
         self.timer_id = None
-        self.best_scores = {"Easy": float('inf'), "Medium": float('inf'), "Hard": float('inf')}
-        self.load_scores()
+        self.score_log = ScoreLog()
+        self.score_log.import_legacy()
+        self.score_error_shown = False
+        self.catalogue = PuzzleCatalogue.load()
+        self.puzzle_played = False
         
         # Create header
         header_frame = tk.Frame(root, bg="#8B4513", height=60)
@@ -67,24 +418,48 @@ class WaterJugGame:
         difficulty_menu.pack(anchor=tk.W, padx=10, pady=5)
         difficulty_menu.bind("<<ComboboxSelected>>", self.update_difficulty_fields)
         
+        # Jug count and scoring selectors
+        options_frame = tk.Frame(control_frame, bg="#deb887")
+        options_frame.pack(fill=tk.X, padx=10)
+        
+        tk.Label(options_frame, text="Jugs:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=0, column=0, sticky=tk.W, pady=2)
+        jug_count_menu = ttk.Combobox(options_frame, textvariable=self.jug_count,
+                                     values=[str(n) for n in PRESETS], state="readonly", width=12)
+        jug_count_menu.grid(row=0, column=1, sticky=tk.W, pady=2)
+        jug_count_menu.bind("<<ComboboxSelected>>", self.update_difficulty_fields)
+        
+        tk.Label(options_frame, text="Score by:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=1, column=0, sticky=tk.W, pady=2)
+        scoring_menu = ttk.Combobox(options_frame, textvariable=self.scoring,
+                                   values=list(COST_MODES), state="readonly", width=12)
+        scoring_menu.grid(row=1, column=1, sticky=tk.W, pady=2)
+        scoring_menu.bind("<<ComboboxSelected>>", self.update_difficulty_fields)
+        
+        tk.Label(options_frame, text="Speed:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=2, column=0, sticky=tk.W, pady=2)
+        speed_menu = ttk.Combobox(options_frame, textvariable=self.animation_speed,
+                                 values=list(ANIMATION_SPEEDS), state="readonly", width=12)
+        speed_menu.grid(row=2, column=1, sticky=tk.W, pady=2)
+        speed_menu.bind("<<ComboboxSelected>>", self.update_animation_speed)
+        
         # Custom settings frame
         self.custom_frame = tk.LabelFrame(control_frame, text="Custom Settings", 
                                          font=("Arial", 10, "bold"), bg="#deb887", fg="#654321",
                                          bd=2, relief=tk.GROOVE)
         self.custom_frame.pack(fill=tk.X, padx=10, pady=5)
         
-        # Grid layout for custom settings
-        tk.Label(self.custom_frame, text="Jug 1 Capacity:", bg="#deb887", fg="#654321").grid(row=0, column=0, sticky=tk.W, padx=5, pady=3)
-        self.jug1_entry = tk.Entry(self.custom_frame, width=6, bg="#fff8dc", fg="#654321", bd=2)
-        self.jug1_entry.grid(row=0, column=1, pady=3)
-        
-        tk.Label(self.custom_frame, text="Jug 2 Capacity:", bg="#deb887", fg="#654321").grid(row=1, column=0, sticky=tk.W, padx=5, pady=3)
-        self.jug2_entry = tk.Entry(self.custom_frame, width=6, bg="#fff8dc", fg="#654321", bd=2)
-        self.jug2_entry.grid(row=1, column=1, pady=3)
-        
-        tk.Label(self.custom_frame, text="Goal Amount:", bg="#deb887", fg="#654321").grid(row=2, column=0, sticky=tk.W, padx=5, pady=3)
+        # Grid layout for custom settings, one capacity row per possible jug
+        self.jug_labels = []
+        self.jug_entries = []
+        for i in range(MAX_JUGS):
+            label = tk.Label(self.custom_frame, text=f"Jug {i + 1} Capacity:", bg="#deb887", fg="#654321")
+            label.grid(row=i, column=0, sticky=tk.W, padx=5, pady=3)
+            entry = tk.Entry(self.custom_frame, width=6, bg="#fff8dc", fg="#654321", bd=2)
+            entry.grid(row=i, column=1, pady=3)
+            self.jug_labels.append(label)
+            self.jug_entries.append(entry)
+        
+        tk.Label(self.custom_frame, text="Goal Amount:", bg="#deb887", fg="#654321").grid(row=MAX_JUGS, column=0, sticky=tk.W, padx=5, pady=3)
         self.goal_entry = tk.Entry(self.custom_frame, width=6, bg="#fff8dc", fg="#654321", bd=2)
-        self.goal_entry.grid(row=2, column=1, pady=3)
+        self.goal_entry.grid(row=MAX_JUGS, column=1, pady=3)
         
         # Button frame
         button_frame = tk.Frame(control_frame, bg="#deb887")
@@ -135,26 +510,33 @@ class WaterJugGame:
                                    width=5, relief=tk.SUNKEN, bd=1)
         self.moves_label.grid(row=0, column=1, sticky=tk.E, pady=2)
         
-        tk.Label(stats_inner, text="Jug 1:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=1, column=0, sticky=tk.W, pady=2)
-        self.jug1_info = tk.Label(stats_inner, text="0/0", bg="#fff8dc", fg="#654321", 
-                                 width=5, relief=tk.SUNKEN, bd=1)
-        self.jug1_info.grid(row=1, column=1, sticky=tk.E, pady=2)
-        
-        tk.Label(stats_inner, text="Jug 2:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=2, column=0, sticky=tk.W, pady=2)
-        self.jug2_info = tk.Label(stats_inner, text="0/0", bg="#fff8dc", fg="#654321", 
-                                 width=5, relief=tk.SUNKEN, bd=1)
-        self.jug2_info.grid(row=2, column=1, sticky=tk.E, pady=2)
-        
-        tk.Label(stats_inner, text="Goal:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=3, column=0, sticky=tk.W, pady=2)
+        tk.Label(stats_inner, text="Poured:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=1, column=0, sticky=tk.W, pady=2)
+        self.poured_label = tk.Label(stats_inner, text="0L", bg="#fff8dc", fg="#654321",
+                                    width=5, relief=tk.SUNKEN, bd=1)
+        self.poured_label.grid(row=1, column=1, sticky=tk.E, pady=2)
+        
+        # One row per possible jug; rows past the current jug count are hidden
+        self.jug_info_names = []
+        self.jug_info = []
+        for i in range(MAX_JUGS):
+            name = tk.Label(stats_inner, text=f"Jug {i + 1}:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold"))
+            name.grid(row=i + 2, column=0, sticky=tk.W, pady=2)
+            info = tk.Label(stats_inner, text="0/0", bg="#fff8dc", fg="#654321",
+                           width=5, relief=tk.SUNKEN, bd=1)
+            info.grid(row=i + 2, column=1, sticky=tk.E, pady=2)
+            self.jug_info_names.append(name)
+            self.jug_info.append(info)
+        
+        tk.Label(stats_inner, text="Goal:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=MAX_JUGS + 2, column=0, sticky=tk.W, pady=2)
         self.goal_info = tk.Label(stats_inner, text="0", bg="#fff8dc", fg="#654321", 
                                  width=5, relief=tk.SUNKEN, bd=1)
-        self.goal_info.grid(row=3, column=1, sticky=tk.E, pady=2)
+        self.goal_info.grid(row=MAX_JUGS + 2, column=1, sticky=tk.E, pady=2)
         
         # Best score display
-        tk.Label(stats_inner, text="Best:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=4, column=0, sticky=tk.W, pady=2)
+        tk.Label(stats_inner, text="Best:", bg="#deb887", fg="#654321", font=("Arial", 9, "bold")).grid(row=MAX_JUGS + 3, column=0, sticky=tk.W, pady=2)
         self.best_score_label = tk.Label(stats_inner, text="-", bg="#fff8dc", fg="#654321", 
                                         width=5, relief=tk.SUNKEN, bd=1)
-        self.best_score_label.grid(row=4, column=1, sticky=tk.E, pady=2)
+        self.best_score_label.grid(row=MAX_JUGS + 3, column=1, sticky=tk.E, pady=2)
         
         # Right panel for the game visual - uses expand=True to utilize available space
         game_frame = tk.Frame(main_frame, bg="#87CEEB", bd=2, relief=tk.SUNKEN)
@@ -167,49 +549,14 @@ class WaterJugGame:
         # Canvas for jug visualization
         self.canvas = tk.Canvas(game_frame, bg="#E0F7FA", relief=tk.SUNKEN, bd=2)
         self.canvas.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
+        self.animator = WaterAnimator(self.root, self.draw_water)
         
-        # Action buttons frame
-        actions_frame = tk.LabelFrame(game_frame, text="ACTIONS", font=("Arial", 10, "bold"),
-                                     bg="#87CEEB", fg="#00008B", bd=2, relief=tk.GROOVE)
-        actions_frame.pack(fill=tk.X, padx=10, pady=5)
-        
-        # First row of action buttons
-        btn_frame1 = tk.Frame(actions_frame, bg="#87CEEB")
-        btn_frame1.pack(fill=tk.X, pady=3)
-        
-        self.fill_jug1_btn = tk.Button(btn_frame1, text="Fill Jug 1", command=lambda: self.perform_action("fill_jug1"),
-                                      bg="#4682B4", fg="white", state=tk.DISABLED, width=9,
-                                      font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.fill_jug1_btn.grid(row=0, column=0, padx=5, pady=3)
-        
-        self.fill_jug2_btn = tk.Button(btn_frame1, text="Fill Jug 2", command=lambda: self.perform_action("fill_jug2"),
-                                      bg="#4682B4", fg="white", state=tk.DISABLED, width=9,
-                                      font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.fill_jug2_btn.grid(row=0, column=1, padx=5, pady=3)
-        
-        self.empty_jug1_btn = tk.Button(btn_frame1, text="Empty Jug 1", command=lambda: self.perform_action("empty_jug1"),
-                                       bg="#DC143C", fg="white", state=tk.DISABLED, width=9,
-                                       font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.empty_jug1_btn.grid(row=0, column=2, padx=5, pady=3)
-        
-        self.empty_jug2_btn = tk.Button(btn_frame1, text="Empty Jug 2", command=lambda: self.perform_action("empty_jug2"),
-                                       bg="#DC143C", fg="white", state=tk.DISABLED, width=9,
-                                       font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.empty_jug2_btn.grid(row=0, column=3, padx=5, pady=3)
-        
-        # Second row of action buttons
-        btn_frame2 = tk.Frame(actions_frame, bg="#87CEEB")
-        btn_frame2.pack(fill=tk.X, pady=3)
-        
-        self.pour_1to2_btn = tk.Button(btn_frame2, text="Pour 1→2", command=lambda: self.perform_action("pour_1to2"),
-                                      bg="#FFA500", fg="white", state=tk.DISABLED, width=9,
-                                      font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.pour_1to2_btn.grid(row=0, column=1, padx=5, pady=3)
-        
-        self.pour_2to1_btn = tk.Button(btn_frame2, text="Pour 2→1", command=lambda: self.perform_action("pour_2to1"),
-                                      bg="#FFA500", fg="white", state=tk.DISABLED, width=9,
-                                      font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
-        self.pour_2to1_btn.grid(row=0, column=2, padx=5, pady=3)
+        # Action buttons frame, filled in by build_action_buttons for the jug count
+        self.actions_frame = tk.LabelFrame(game_frame, text="ACTIONS", font=("Arial", 10, "bold"),
+                                          bg="#87CEEB", fg="#00008B", bd=2, relief=tk.GROOVE)
+        self.actions_frame.pack(fill=tk.X, padx=10, pady=5)
+        self.action_buttons = []
+        self.build_action_buttons()
         
         # Message box for game feedback
         message_frame = tk.LabelFrame(game_frame, text="LABORATORY NOTES", 
@@ -236,47 +583,113 @@ class WaterJugGame:
         # Bind resize event to redraw
         self.root.bind("<Configure>", self.on_resize)
         
+        # Pause the timer while minimized
+        self.root.bind("<Unmap>", self.on_minimize)
+        self.root.bind("<Map>", self.on_restore)
+        
         # Set initial values based on difficulty
         self.update_difficulty_fields()
     
+    def build_action_buttons(self):
+        """Create fill, empty and pour buttons for every jug in the current system"""
+        for child in self.actions_frame.winfo_children():
+            child.destroy()
+        self.action_buttons = []
+        count = len(self.capacities)
+        
+        # Fills and empties share a row while they fit in four columns
+        btn_frame1 = tk.Frame(self.actions_frame, bg="#87CEEB")
+        btn_frame1.pack(fill=tk.X, pady=3)
+        columns = 2 * count if count <= 2 else count
+        
+        # Pours go below, at most six to a row
+        btn_frame2 = tk.Frame(self.actions_frame, bg="#87CEEB")
+        btn_frame2.pack(fill=tk.X, pady=3)
+        pour_columns = min(6, count * (count - 1))
+        
+        pour_index = 0
+        for index, action in enumerate(self.system.actions):
+            kind, source, target = action
+            if kind == FILL:
+                text, color = f"Fill Jug {source + 1}", "#4682B4"
+            elif kind == EMPTY:
+                text, color = f"Empty Jug {source + 1}", "#DC143C"
+            else:
+                text, color = f"Pour {source + 1}→{target + 1}", "#FFA500"
+            
+            if index < 2 * count:
+                frame, row, column = btn_frame1, index // columns, index % columns
+            else:
+                frame, row, column = btn_frame2, pour_index // pour_columns, pour_index % pour_columns
+                pour_index += 1
+            
+            button = tk.Button(frame, text=text, command=lambda action=action: self.perform_action(action),
+                               bg=color, fg="white", state=tk.DISABLED, width=9,
+                               font=("Arial", 9, "bold"), relief=tk.RAISED, bd=2)
+            button.grid(row=row, column=column, padx=5, pady=3)
+            self.action_buttons.append(button)
+    
     def on_resize(self, event):
         """Handle window resize events"""
-        # Only redraw if game is active and it's the root window being resized
-        if self.game_active and event.widget == self.root:
+        # A drag fires many events; redraw once when Tk next goes idle
+        if self.game_active and event.widget == self.root and self.resize_id is None:
+            self.resize_id = self.root.after_idle(self.finish_resize)
+    
+    def finish_resize(self):
+        """Refit the jugs if the canvas size changed since they were last drawn"""
+        self.resize_id = None
+        if self.game_active and (self.canvas.winfo_width(), self.canvas.winfo_height()) != self.canvas_size:
             self.draw_jugs()
     
-    def load_scores(self):
-        """Load best scores from file"""
+    def record_result(self):
+        """Log the finished game once and show the puzzle's best score
+        
+        The board then stays locked until the game is restarted, so further
+        moves cannot log the same game again.
+        """
+        if self.puzzle_solved:
+            return
+        self.puzzle_solved = True
+        self.disable_all_buttons()
+        self.restart_btn.config(state=tk.NORMAL)
+        
+        record = {
+            "puzzle": puzzle_key(self.capacities, self.goal_amount, self.cost_mode),
+            "mode": self.cost_mode,
+            "capacities": list(self.capacities),
+            "goal": self.goal_amount,
+            "difficulty": self.difficulty_level.get(),
+            "moves": self.moves_count,
+            "litres": self.litres_poured,
+            "seconds": round(self.clock.elapsed(), 3),
+            "auto": self.assisted,
+            "finished": time.time(),
+        }
         try:
-            with open("water_jug_scores.txt", "r") as f:
-                for line in f:
-                    difficulty, score = line.strip().split(":")
-                    if int(score) < self.best_scores[difficulty]:
-                        self.best_scores[difficulty] = int(score)
-        except:
-            # If file not found or corrupt, use defaults
-            pass
+            self.score_log.append(record)
+        except OSError as e:
+            messagebox.showwarning("Scores Not Saved", f"Could not write {self.score_log.path}:\n{e}")
+        self.show_best_score(self.capacities, self.goal_amount)
+    
+    def show_best_score(self, capacities, goal):
+        """Show the best score logged for a puzzle under the selected scoring"""
+        best_score = self.score_log.best(puzzle_key(capacities, goal, COST_MODES[self.scoring.get()]))
+        if self.score_log.error is not None and not self.score_error_shown:
+            self.score_error_shown = True
+            messagebox.showwarning("Scores Not Loaded",
+                                   f"Could not read {self.score_log.path}:\n{self.score_log.error}")
+        self.best_score_label.config(text=str(best_score) if best_score is not None else "-")
     
-    def save_scores(self):
-        """Save best scores to file"""
-        try:
-            with open("water_jug_scores.txt", "w") as f:
-                for diff, score in self.best_scores.items():
-                    if score < float('inf'):
-                        f.write(f"{diff}:{score}\n")
-        except:
-            # If can't save, just ignore
-            pass
-        
     def display_instructions(self):
         """Display game instructions in the message box"""
         welcome_message = (
             "Welcome to the Water Jug Challenge!\n\n"
-            "OBJECTIVE: Measure exactly the GOAL amount of water using two jugs of different capacities.\n\n"
+            "OBJECTIVE: Measure exactly the GOAL amount of water using two to four jugs of different capacities.\n\n"
             "You can only:\n"
             "- Fill a jug completely\n"
             "- Empty a jug completely\n"
-            "- Pour water from one jug to the other\n\n"
+            "- Pour water from one jug into another\n\n"
+            "Score by moves, or by litres poured to count every litre you fill, empty or pour.\n\n"
             "Select a difficulty and press 'New Game' to start."
         )
         self.update_message(welcome_message)
@@ -292,10 +705,16 @@ class WaterJugGame:
     def update_difficulty_fields(self, event=None):
         """Update the custom fields based on difficulty selection"""
         difficulty = self.difficulty_level.get()
+        count = int(self.jug_count.get())
         
-        # Update best score display
-        best_score = self.best_scores.get(difficulty, float('inf'))
-        self.best_score_label.config(text=str(best_score) if best_score < float('inf') else "-")
+        # Show a capacity row for each jug in use
+        for i, (label, entry) in enumerate(zip(self.jug_labels, self.jug_entries)):
+            if i < count:
+                label.grid()
+                entry.grid()
+            else:
+                label.grid_remove()
+                entry.grid_remove()
         
         if difficulty == "Custom":
             # Enable custom fields
@@ -304,96 +723,148 @@ class WaterJugGame:
                     child.config(state=tk.NORMAL)
         else:
             # Set default values based on difficulty and disable fields
-            for child in self.custom_frame.winfo_children():
-                if isinstance(child, tk.Entry):
-                    child.config(state=tk.DISABLED)
-            
-            if difficulty == "Easy":
-                self.jug1_entry.delete(0, tk.END)
-                self.jug1_entry.insert(0, "5")
-                self.jug2_entry.delete(0, tk.END)
-                self.jug2_entry.insert(0, "3")
-                self.goal_entry.delete(0, tk.END)
-                self.goal_entry.insert(0, "4")
-            elif difficulty == "Medium":
-                self.jug1_entry.delete(0, tk.END)
-                self.jug1_entry.insert(0, "7")
-                self.jug2_entry.delete(0, tk.END)
-                self.jug2_entry.insert(0, "3")
-                self.goal_entry.delete(0, tk.END)
-                self.goal_entry.insert(0, "2")
-            elif difficulty == "Hard":
-                self.jug1_entry.delete(0, tk.END)
-                self.jug1_entry.insert(0, "11")
-                self.jug2_entry.delete(0, tk.END)
-                self.jug2_entry.insert(0, "6")
-                self.goal_entry.delete(0, tk.END)
-                self.goal_entry.insert(0, "8")
-    
-    def is_solvable(self, jug1, jug2, goal):
-        """Check if the water jug problem is solvable"""
-        # The problem is solvable if goal is a multiple of gcd(jug1, jug2)
-        gcd = math.gcd(jug1, jug2)
-        return goal % gcd == 0 and goal <= max(jug1, jug2)
+            self.show_puzzle(*self.preset_puzzle(count, difficulty))
+        
+        # Update best score display for the puzzle in the fields
+        try:
+            capacities = tuple(int(entry.get()) for entry in self.jug_entries[:count])
+            self.show_best_score(capacities, int(self.goal_entry.get()))
+        except ValueError:
+            self.best_score_label.config(text="-")
+    
+    def preset_puzzle(self, count, difficulty):
+        """(capacities, goal) for a difficulty: a random catalogue puzzle for two jugs, else the preset"""
+        if count == 2 and self.catalogue is not None:
+            puzzle = self.catalogue.pick(*CATALOGUE_MOVES[difficulty])
+            if puzzle is not None:
+                return puzzle
+        return PRESETS[count][difficulty]
+    
+    def show_puzzle(self, capacities, goal):
+        """Put a preset puzzle in the custom fields, which stay disabled"""
+        for child in self.custom_frame.winfo_children():
+            if isinstance(child, tk.Entry):
+                child.config(state=tk.NORMAL)
+        
+        for entry, capacity in zip(self.jug_entries, capacities):
+            entry.delete(0, tk.END)
+            entry.insert(0, str(capacity))
+        self.goal_entry.delete(0, tk.END)
+        self.goal_entry.insert(0, str(goal))
+        self.puzzle_played = False
+        
+        for child in self.custom_frame.winfo_children():
+            if isinstance(child, tk.Entry):
+                child.config(state=tk.DISABLED)
     
     def start_timer(self):
         """Start the timer for tracking puzzle solve time"""
-        self.time_start = time.time()
+        self.clock.start()
         self.timer_running = True
         self.update_timer()
     
     def update_timer(self):
-        """Update the timer display"""
-        if self.timer_running:
-            elapsed = int(time.time() - self.time_start)
-            minutes = elapsed // 60
-            seconds = elapsed % 60
-            self.timer_label.config(text=f"{minutes:02d}:{seconds:02d}")
-            self.timer_id = self.root.after(1000, self.update_timer)
+        """Update the timer display, then wait for the next whole second of play"""
+        self.timer_id = None
+        if self.timer_running and self.clock.running:
+            elapsed = self.clock.elapsed()
+            self.show_time(elapsed)
+            # Wake just after the next second boundary so the display never drifts
+            delay = int((1 - elapsed % 1) * 1000) + 1
+            self.timer_id = self.root.after(delay, self.update_timer)
+    
+    def show_time(self, elapsed):
+        minutes, seconds = divmod(int(elapsed), 60)
+        self.timer_label.config(text=f"{minutes:02d}:{seconds:02d}")
     
     def stop_timer(self):
         """Stop the timer"""
         self.timer_running = False
+        self.clock.pause()
         if self.timer_id:
             self.root.after_cancel(self.timer_id)
             self.timer_id = None
     
+    def on_minimize(self, event):
+        """Pause the clock while the window is minimized"""
+        if event.widget == self.root and self.timer_running:
+            self.clock.pause()
+            if self.timer_id:
+                self.root.after_cancel(self.timer_id)
+                self.timer_id = None
+    
+    def on_restore(self, event):
+        """Resume the clock when the window is shown again"""
+        if event.widget == self.root and self.timer_running and not self.clock.running:
+            self.clock.resume()
+            self.update_timer()
+    
+    def equipment_text(self):
+        """The jugs in play, e.g. "5L jug and 3L jug" """
+        jugs = [f"{capacity}L jug" for capacity in self.capacities]
+        return ", ".join(jugs[:-1]) + " and " + jugs[-1]
+    
     def new_game(self):
         """Start a new game with current settings"""
         difficulty = self.difficulty_level.get()
+        count = int(self.jug_count.get())
+        
+        # Every new game at a set difficulty gets a fresh puzzle from the catalogue
+        if difficulty != "Custom" and self.puzzle_played:
+            self.show_puzzle(*self.preset_puzzle(count, difficulty))
         
         try:
+            capacities = tuple(int(entry.get()) for entry in self.jug_entries[:count])
+            goal_amount = int(self.goal_entry.get())
+            
             if difficulty == "Custom":
-                jug1_capacity = int(self.jug1_entry.get())
-                jug2_capacity = int(self.jug2_entry.get())
-                goal_amount = int(self.goal_entry.get())
-                
-                if jug1_capacity <= 0 or jug2_capacity <= 0:
+                if min(capacities) <= 0:
                     messagebox.showerror("Invalid Input", "Jug capacities must be positive!")
                     return
                 
-                if goal_amount > max(jug1_capacity, jug2_capacity):
+                if goal_amount < 0:
+                    messagebox.showerror("Invalid Input", "Goal cannot be negative!")
+                    return
+                
+                if goal_amount > max(capacities):
                     messagebox.showerror("Invalid Input", "Goal must be ≤ max jug capacity!")
                     return
                 
-                if not self.is_solvable(jug1_capacity, jug2_capacity, goal_amount):
+                if not is_solvable(capacities, goal_amount):
                     messagebox.showerror("Invalid Problem", "This problem is not solvable! Try different values.")
                     return
-            else:
-                # Use predefined values
-                jug1_capacity = int(self.jug1_entry.get())
-                jug2_capacity = int(self.jug2_entry.get())
-                goal_amount = int(self.goal_entry.get())
+                
+                if not can_solve(capacities, COST_MODES[self.scoring.get()]):
+                    messagebox.showerror("Invalid Problem", "These jugs are too large to solve! Try smaller capacities.")
+                    return
+            
+            # Drop the previous puzzle before anything about the new one is set up
+            if self.auto_solving:
+                self.stop_auto_solve()
+            self.game_active = False
+            self.solution_path = []
             
             # Set up the game
-            self.jug1_capacity = jug1_capacity
-            self.jug2_capacity = jug2_capacity
+            rebuild_buttons = len(capacities) != len(self.capacities)
+            self.system = JugSystem(capacities)
+            self.capacities = capacities
+            if rebuild_buttons:
+                self.build_action_buttons()
             self.goal_amount = goal_amount
-            self.jug1_current = 0
-            self.jug2_current = 0
+            self.cost_mode = COST_MODES[self.scoring.get()]
+            
+            # Calculate solution path for hints
+            self.calculate_solution()
+            
+            self.current = [0] * count
             self.moves_count = 0
+            self.litres_poured = 0
             self.game_active = True
+            self.puzzle_solved = False
+            self.assisted = False
+            self.puzzle_played = True
             self.current_hint_index = 0
+            self.animator.reset(self.current)
             
             # Stop previous timer if running
             self.stop_timer()
@@ -407,70 +878,51 @@ class WaterJugGame:
             welcome_message = (
                 f"New game started!\n\n"
                 f"OBJECTIVE: Measure exactly {goal_amount}L of water\n"
-                f"EQUIPMENT: {jug1_capacity}L jug and {jug2_capacity}L jug\n\n"
+                f"EQUIPMENT: {self.equipment_text()}\n\n"
                 f"Good luck!"
             )
             self.update_message(welcome_message)
             
             # Enable game buttons
             self.enable_game_buttons()
-            
-            # Calculate solution path for hints
-            self.calculate_solution()
-            
+        
         except ValueError:
             messagebox.showerror("Input Error", "Please enter valid numbers for all fields!")
     
     def calculate_solution(self):
-        """Calculate a solution path for the current problem using BFS algorithm"""
-        x = self.jug1_capacity
-        y = self.jug2_capacity
-        z = self.goal_amount
-        
-        # Using BFS to find the shortest path
-        visited = set()
-        queue = [[(0, 0)]]  # Queue of paths
-        
-        while queue:
-            path = queue.pop(0)
-            current_state = path[-1]
-            a, b = current_state
-            
-            if a == z or b == z:
-                self.solution_path = path
-                return
-            
-            if current_state in visited:
-                continue
-                
-            visited.add(current_state)
-            
-            # Generate all possible next states
-            next_states = [
-                (x, b),  # Fill jug 1
-                (a, y),  # Fill jug 2
-                (0, b),  # Empty jug 1
-                (a, 0),  # Empty jug 2
-                (min(a + b, x), max(0, a + b - x)),  # Pour jug 2 to jug 1
-                (max(0, a + b - y), min(a + b, y))   # Pour jug 1 to jug 2
-            ]
-            
-            for next_state in next_states:
-                if next_state not in visited:
-                    new_path = path + [next_state]
-                    queue.append(new_path)
-        
-        # If no solution is found
-        self.solution_path = []
+        """Calculate an optimal solution from the start for auto-solve and hints
+        
+        The HintTable covering every state searches the whole puzzle, so it is
+        left for provide_hint to build when a hint is first asked for.
+        """
+        self.hint_table = None
+        solution = solve(self.capacities, self.goal_amount, self.cost_mode)
+        self.solution_path = solution.states if solution is not None else []
     
     def provide_hint(self):
-        """Provide a hint based on the calculated solution path"""
+        """Provide a hint for the best next move from the current state"""
         if not self.game_active or not self.solution_path:
             return
         
-        current_state = (self.jug1_current, self.jug2_current)
+        current_state = tuple(self.current)
+        
+        if self.hint_table is None and self.system.state_count <= HINT_TABLE_STATE_LIMIT:
+            self.hint_table = HintTable(self.system, self.goal_amount, self.cost_mode)
         
-        # Find current state in solution path
+        if self.hint_table is not None:
+            state = self.system.pack(current_state)
+            action = self.hint_table.next_action(state)
+            if action is None:
+                self.update_message("You're at the goal state! No more hints needed.")
+                return
+            next_state = self.system.unpack(self.system.apply(state, action)[0])
+            hint = self.get_move_description(current_state, next_state)
+            cost = self.hint_table.cost(state)
+            to_go = f"{cost} moves to go" if self.cost_mode == MOVES else f"{cost}L left to pour"
+            self.update_message(f"HINT: {hint} ({to_go})")
+            return
+        
+        # Too large for a hint table: hints only follow the solution path
         if current_state in self.solution_path:
             idx = self.solution_path.index(current_state)
             if idx < len(self.solution_path) - 1:
@@ -485,33 +937,19 @@ class WaterJugGame:
     
     def get_move_description(self, current, next_state):
         """Get the description of the move from current to next state"""
-        a, b = current
-        c, d = next_state
-        
-        if c == self.jug1_capacity and a != self.jug1_capacity:
-            return f"Fill the {self.jug1_capacity}L jug completely"
-        elif d == self.jug2_capacity and b != self.jug2_capacity:
-            return f"Fill the {self.jug2_capacity}L jug completely"
-        elif c == 0 and a != 0:
-            return "Empty the first jug"
-        elif d == 0 and b != 0:
-            return "Empty the second jug"
-        elif a < c and b > d:
-            return f"Pour water from jug 2 into jug 1"
-        elif a > c and b < d:
-            return f"Pour water from jug 1 into jug 2"
-        else:
-            return "Move to the next state in the solution"
+        return describe_move(self.capacities, current, next_state)
     
     def restart_game(self):
         """Restart the game with the same parameters"""
         if not self.game_active:
             return
-            
-        self.jug1_current = 0
-        self.jug2_current = 0
+        
+        self.current = [0] * len(self.capacities)
         self.moves_count = 0
+        self.litres_poured = 0
         self.current_hint_index = 0
+        self.puzzle_solved = False
+        self.animator.reset(self.current)
         
         # Reset timer
         self.stop_timer()
@@ -519,85 +957,107 @@ class WaterJugGame:
         
         self.update_stats()
         self.draw_jugs()
-        self.update_message(f"Game restarted!\n\nOBJECTIVE: Measure exactly {self.goal_amount}L of water\nEQUIPMENT: {self.jug1_capacity}L jug and {self.jug2_capacity}L jug")
+        self.enable_game_buttons()
+        self.update_message(f"Game restarted!\n\nOBJECTIVE: Measure exactly {self.goal_amount}L of water\nEQUIPMENT: {self.equipment_text()}")
     
     def auto_solve(self):
-        """Automatically solve the puzzle with animation"""
-        if not self.game_active or not self.solution_path:
+        """Automatically solve the puzzle with animation, or stop a running auto-solve"""
+        if self.auto_solving:
+            self.stop_auto_solve()
             return
-            
-        # Disable all buttons during animation
+        if not self.game_active or self.puzzle_solved or not self.solution_path:
+            return
+        
+        # Disable all buttons but Stop during animation
         self.disable_all_buttons()
+        self.auto_solving = True
+        # Even if it is stopped and the player finishes by hand, the solver showed the way
+        self.assisted = True
+        self.solve_btn.config(text="Stop", state=tk.NORMAL)
         
-        # Reset to initial state
-        self.jug1_current = 0
-        self.jug2_current = 0
+        # Drain back to the initial state
+        self.current = [0] * len(self.capacities)
         self.moves_count = 0
+        self.litres_poured = 0
         self.update_stats()
-        self.draw_jugs()
         
         self.update_message("AUTO-SOLVER ACTIVATED\n\nThe solution will be demonstrated step by step...")
+        self.animator.animate_to(self.current, on_done=lambda: self.schedule_auto_solve_step(1))
+    
+    def schedule_auto_solve_step(self, step_idx):
+        """Pause on the state just reached, then play the next step"""
+        pause = AUTO_SOLVE_PAUSE_MS / self.animator.speed
+        self.auto_solve_id = self.root.after(int(pause), lambda: self.auto_solve_step(step_idx))
+    
+    def auto_solve_step(self, step_idx):
+        """Animate one step of the solution path, or wrap up after the last"""
+        self.auto_solve_id = None
+        if step_idx < len(self.solution_path):
+            # The plan for huge puzzles is generated on demand, so it is only
+            # ever read forwards; the state before this step is self.current
+            previous, state = tuple(self.current), self.solution_path[step_idx]
+            self.litres_poured += litres_moved(previous, state)
+            self.current = list(state)
+            self.moves_count = step_idx
+            self.update_stats()
+            
+            move_desc = self.get_move_description(previous, state)
+            amounts = ", ".join(f"Jug {i + 1}: {amount}L" for i, amount in enumerate(state))
+            step_message = f"AUTO-SOLVER (Step {step_idx}/{len(self.solution_path)-1})\n\n{move_desc}\n\n{amounts}"
+            self.update_message(step_message)
+            
+            self.animator.animate_to(self.current, on_done=lambda: self.schedule_auto_solve_step(step_idx + 1))
+            return
         
-        # Schedule the animation steps
-        def animate_step(step_idx):
-            if step_idx < len(self.solution_path):
-                a, b = self.solution_path[step_idx]
-                self.jug1_current = a
-                self.jug2_current = b
-                self.moves_count = step_idx
-                self.update_stats()
-                self.draw_jugs()
-                
-                if step_idx > 0:
-                    move_desc = self.get_move_description(self.solution_path[step_idx-1], self.solution_path[step_idx])
-                    step_message = f"AUTO-SOLVER (Step {step_idx}/{len(self.solution_path)-1})\n\n{move_desc}\n\nJug 1: {a}L, Jug 2: {b}L"
-                    self.update_message(step_message)
-                
-                self.root.after(1000, lambda: animate_step(step_idx + 1))
-            else:
-                self.update_message("AUTO-SOLVE COMPLETE\n\nThis is one optimal solution with minimum steps.")
-                self.enable_game_buttons()
-                
-                # Check if goal is reached
-                if self.jug1_current == self.goal_amount or self.jug2_current == self.goal_amount:
-                    self.update_message("AUTO-SOLVE COMPLETE!\n\nPuzzle solved in " + 
-                                     f"{len(self.solution_path)-1} moves.\n\n" +
-                                     "This is one optimal solution with minimum steps.")
-                    # Update best score if this is better
-                    if self.difficulty_level.get() != "Custom":
-                        diff = self.difficulty_level.get()
-                        if len(self.solution_path)-1 < self.best_scores[diff]:
-                            self.best_scores[diff] = len(self.solution_path)-1
-                            self.best_score_label.config(text=str(self.best_scores[diff]))
-                            self.save_scores()
-                else:
-                    self.update_message("AUTO-SOLVE FAILED\n\nUnable to reach the goal state.")
-                
-                self.enable_game_buttons()
+        self.finish_auto_solve()
         
-        # Start animation from the beginning
-        animate_step(0)
+        # Check if goal is reached
+        if self.goal_amount in self.current:
+            if self.cost_mode == LITRES:
+                summary = f"{self.moves_count} moves pouring {self.litres_poured}L.\n\n" \
+                          "This is one optimal solution with the fewest litres poured."
+            else:
+                summary = f"{self.moves_count} moves.\n\n" \
+                          "This is one optimal solution with minimum steps."
+            self.update_message("AUTO-SOLVE COMPLETE!\n\nPuzzle solved in " + summary)
+            # Log the result and show the best score
+            self.record_result()
+        else:
+            self.update_message("AUTO-SOLVE FAILED\n\nUnable to reach the goal state.")
+    
+    def stop_auto_solve(self):
+        """Interrupt the auto-solver; play continues from the state it reached"""
+        if self.auto_solve_id is not None:
+            self.root.after_cancel(self.auto_solve_id)
+            self.auto_solve_id = None
+        # Let the water finish its current pour, but start no more steps
+        self.animator.on_done = None
+        self.finish_auto_solve()
+        self.update_message(f"AUTO-SOLVER STOPPED\n\nStopped after {self.moves_count} moves. "
+                            "Carry on from here; hints work from any state.")
+    
+    def finish_auto_solve(self):
+        """Restore the controls the auto-solver took over"""
+        self.auto_solving = False
+        self.solve_btn.config(text="Auto Solve")
+        self.enable_game_buttons()
+    
+    def update_animation_speed(self, event=None):
+        """Apply the selected animation speed, including to pours already under way"""
+        self.animator.speed = ANIMATION_SPEEDS[self.animation_speed.get()]
     
     def enable_game_buttons(self):
         """Enable all game control buttons"""
-        self.fill_jug1_btn.config(state=tk.NORMAL)
-        self.fill_jug2_btn.config(state=tk.NORMAL)
-        self.empty_jug1_btn.config(state=tk.NORMAL)
-        self.empty_jug2_btn.config(state=tk.NORMAL)
-        self.pour_1to2_btn.config(state=tk.NORMAL)
-        self.pour_2to1_btn.config(state=tk.NORMAL)
+        for button in self.action_buttons:
+            button.config(state=tk.NORMAL)
         self.hint_btn.config(state=tk.NORMAL)
         self.restart_btn.config(state=tk.NORMAL)
         self.solve_btn.config(state=tk.NORMAL)
     
     def disable_all_buttons(self):
         """Disable all game control buttons"""
-        self.fill_jug1_btn.config(state=tk.DISABLED)
-        self.fill_jug2_btn.config(state=tk.DISABLED)
-        self.empty_jug1_btn.config(state=tk.DISABLED)
-        self.empty_jug2_btn.config(state=tk.DISABLED)
-        self.pour_1to2_btn.config(state=tk.DISABLED)
-        self.pour_2to1_btn.config(state=tk.DISABLED)
+        for button in self.action_buttons:
+            button.config(state=tk.DISABLED)
         self.hint_btn.config(state=tk.DISABLED)
         self.restart_btn.config(state=tk.DISABLED)
         self.solve_btn.config(state=tk.DISABLED)
@@ -605,167 +1065,164 @@ class WaterJugGame:
     def update_stats(self):
         """Update the game statistics display"""
         self.moves_label.config(text=str(self.moves_count))
-        self.jug1_info.config(text=f"{self.jug1_current}/{self.jug1_capacity}")
-        self.jug2_info.config(text=f"{self.jug2_current}/{self.jug2_capacity}")
+        self.poured_label.config(text=f"{self.litres_poured}L")
+        for i, (name, info) in enumerate(zip(self.jug_info_names, self.jug_info)):
+            if i < len(self.capacities):
+                info.config(text=f"{self.current[i]}/{self.capacities[i]}")
+                name.grid()
+                info.grid()
+            else:
+                name.grid_remove()
+                info.grid_remove()
         self.goal_info.config(text=str(self.goal_amount))
     
-    def draw_jugs(self):
-        """Draw the jugs on the canvas with water visualization"""
-        # Clear canvas
+    def create_jug_items(self):
+        """Create the canvas items for the current jugs; draw_jugs only moves and relabels them"""
         self.canvas.delete("all")
-        
-        # Get canvas dimensions
+        self.jug_items = []
+        for capacity in self.capacities:
+            outline = self.canvas.create_rectangle(0, 0, 0, 0, width=2, outline="#4682B4", fill="#F0F8FF")
+            water = self.canvas.create_rectangle(0, 0, 0, 0, fill="#1E90FF", outline="", state=tk.HIDDEN)
+            label = self.canvas.create_text(0, 0, text=f"{capacity}L Jug",
+                                            fill="#00008B", font=("Arial", 10, "bold"))
+            level = self.canvas.create_text(0, 0, text="", fill="white",
+                                            font=("Arial", 12, "bold"), state=tk.HIDDEN)
+            self.jug_items.append((outline, water, label, level))
+        self.goal_item = self.canvas.create_text(0, 0, text="", fill="#B22222", font=("Arial", 14, "bold"))
+        self.level_texts = [None] * len(self.capacities)
+        self.item_capacities = self.capacities
+    
+    def jug_layout(self):
+        """Jug centre xs, width, height and bottom y for the current canvas size"""
         canvas_width = self.canvas.winfo_width()
         canvas_height = self.canvas.winfo_height()
+        self.canvas_size = (canvas_width, canvas_height)
         
         # Calculate jug dimensions and positions
-        jug_width = min(80, canvas_width / 5)
+        count = len(self.capacities)
+        jug_spacing = min(canvas_width / (count + 1), 160)
+        jug_width = min(80, canvas_width / 5, jug_spacing * 0.8)
         jug_height = min(180, canvas_height * 0.7)
-        jug_spacing = min(canvas_width / 3, 160)
         
         center_x = canvas_width / 2
-        jug1_x = center_x - jug_spacing / 2
-        jug2_x = center_x + jug_spacing / 2
+        jug_xs = [center_x + (i - (count - 1) / 2) * jug_spacing for i in range(count)]
         jug_bottom_y = canvas_height - 40
+        return jug_xs, jug_width, jug_height, jug_bottom_y
+    
+    def draw_jugs(self):
+        """Fit the jugs to the canvas and show the current water levels"""
+        if self.item_capacities != self.capacities:
+            self.create_jug_items()
+        self.layout = self.jug_layout()
+        jug_xs, jug_width, jug_height, jug_bottom_y = self.layout
+        
+        for i, (outline, water, label, level) in enumerate(self.jug_items):
+            jug_x = jug_xs[i]
+            self.canvas.coords(outline, jug_x - jug_width/2, jug_bottom_y - jug_height,
+                               jug_x + jug_width/2, jug_bottom_y)
+            self.canvas.coords(label, jug_x, jug_bottom_y + 15)
+            self.draw_water(i, self.animator.amounts[i])
+        
+        # Goal indicator
+        self.canvas.coords(self.goal_item, self.canvas_size[0]/2, 30)
+        self.canvas.itemconfig(self.goal_item, text=f"GOAL: {self.goal_amount}L")
+    
+    def draw_water(self, jug, amount):
+        """Move one jug's water rectangle and level text to show amount litres
+        
+        Called every animation frame, so the items are only reconfigured when
+        the rounded level text or visibility changes.
+        """
+        _, water, _, level = self.jug_items[jug]
+        text = f"{round(amount)}L" if amount > 0 else None
+        if text != self.level_texts[jug]:
+            self.level_texts[jug] = text
+            state = tk.NORMAL if text else tk.HIDDEN
+            self.canvas.itemconfig(water, state=state)
+            self.canvas.itemconfig(level, text=text or "", state=state)
+        if text is None:
+            return
         
-        # Draw jug outlines
-        self.canvas.create_rectangle(jug1_x - jug_width/2, jug_bottom_y - jug_height, 
-                                    jug1_x + jug_width/2, jug_bottom_y, 
-                                    width=2, outline="#4682B4", fill="#F0F8FF")
-        
-        self.canvas.create_rectangle(jug2_x - jug_width/2, jug_bottom_y - jug_height, 
-                                    jug2_x + jug_width/2, jug_bottom_y, 
-                                    width=2, outline="#4682B4", fill="#F0F8FF")
-        
-        # Draw capacity labels
-        self.canvas.create_text(jug1_x, jug_bottom_y + 15, 
-                               text=f"{self.jug1_capacity}L Jug", 
-                               fill="#00008B", font=("Arial", 10, "bold"))
-        
-        self.canvas.create_text(jug2_x, jug_bottom_y + 15, 
-                               text=f"{self.jug2_capacity}L Jug", 
-                               fill="#00008B", font=("Arial", 10, "bold"))
-        
-        # Draw water in jugs (if any)
-        if self.jug1_current > 0:
-            water_height = (self.jug1_current / self.jug1_capacity) * jug_height
-            self.canvas.create_rectangle(jug1_x - jug_width/2 + 2, 
-                                        jug_bottom_y - water_height,
-                                        jug1_x + jug_width/2 - 2, 
-                                        jug_bottom_y - 2,
-                                        fill="#1E90FF", outline="")
-            
-            # Water level text
-            self.canvas.create_text(jug1_x, jug_bottom_y - water_height/2, 
-                                   text=f"{self.jug1_current}L", 
-                                   fill="white", font=("Arial", 12, "bold"))
-        
-        if self.jug2_current > 0:
-            water_height = (self.jug2_current / self.jug2_capacity) * jug_height
-            self.canvas.create_rectangle(jug2_x - jug_width/2 + 2, 
-                                        jug_bottom_y - water_height,
-                                        jug2_x + jug_width/2 - 2, 
-                                        jug_bottom_y - 2,
-                                        fill="#1E90FF", outline="")
-            
-            # Water level text
-            self.canvas.create_text(jug2_x, jug_bottom_y - water_height/2, 
-                                   text=f"{self.jug2_current}L", 
-                                   fill="white", font=("Arial", 12, "bold"))
-        
-        # Draw goal indicator
-        goal_y = 30
-        self.canvas.create_text(canvas_width/2, goal_y, 
-                               text=f"GOAL: {self.goal_amount}L", 
-                               fill="#B22222", font=("Arial", 14, "bold"))
+        jug_xs, jug_width, jug_height, jug_bottom_y = self.layout
+        jug_x = jug_xs[jug]
+        water_height = (amount / self.capacities[jug]) * jug_height
+        self.canvas.coords(water, jug_x - jug_width/2 + 2, jug_bottom_y - water_height,
+                           jug_x + jug_width/2 - 2, jug_bottom_y - 2)
+        self.canvas.coords(level, jug_x, jug_bottom_y - water_height/2)
     
     def perform_action(self, action):
-        """Perform a water jug action"""
-        if not self.game_active:
+        """Perform a water jug action, one of self.system.actions"""
+        if not self.game_active or self.puzzle_solved:
             return
-            
-        old_state = (self.jug1_current, self.jug2_current)
         
         # Increase move counter
         self.moves_count += 1
         
-        action_desc = ""
-        
-        # Perform the selected action
-        if action == "fill_jug1":
-            self.jug1_current = self.jug1_capacity
-            action_desc = f"Filled Jug 1 to capacity ({self.jug1_capacity}L)"
-        
-        elif action == "fill_jug2":
-            self.jug2_current = self.jug2_capacity
-            action_desc = f"Filled Jug 2 to capacity ({self.jug2_capacity}L)"
-        
-        elif action == "empty_jug1":
-            self.jug1_current = 0
-            action_desc = "Emptied Jug 1"
-        
-        elif action == "empty_jug2":
-            self.jug2_current = 0
-            action_desc = "Emptied Jug 2"
-        
-        elif action == "pour_1to2":
-            # Pour from jug 1 to jug 2
-            amount = min(self.jug1_current, self.jug2_capacity - self.jug2_current)
-            self.jug1_current -= amount
-            self.jug2_current += amount
-            action_desc = f"Poured {amount}L from Jug 1 to Jug 2"
+        # Perform the selected action; one that changes nothing still counts as a move
+        result = self.system.apply(self.system.pack(self.current), action)
+        litres = 0
+        if result is not None:
+            state, litres = result
+            self.current = list(self.system.unpack(state))
+            self.litres_poured += litres
         
-        elif action == "pour_2to1":
-            # Pour from jug 2 to jug 1
-            amount = min(self.jug2_current, self.jug1_capacity - self.jug1_current)
-            self.jug2_current -= amount
-            self.jug1_current += amount
-            action_desc = f"Poured {amount}L from Jug 2 to Jug 1"
+        action_desc = describe_action(self.capacities, action, litres)
         
         # Update display
         self.update_stats()
-        self.draw_jugs()
+        self.animator.animate_to(self.current)
         
         # Check for solution
-        if self.jug1_current == self.goal_amount or self.jug2_current == self.goal_amount:
+        if self.goal_amount in self.current:
             self.stop_timer()
-            elapsed_time = int(time.time() - self.time_start)
+            elapsed_time = self.clock.elapsed()
+            self.show_time(elapsed_time)
+            
+            # Log the result and show the best score
+            self.record_result()
             
-            # Update best score if applicable
-            if self.difficulty_level.get() != "Custom":
-                diff = self.difficulty_level.get()
-                if self.moves_count < self.best_scores[diff]:
-                    self.best_scores[diff] = self.moves_count
-                    self.best_score_label.config(text=str(self.best_scores[diff]))
-                    self.save_scores()
-                    
             congrats_msg = (
                 f"CONGRATULATIONS!\n\n"
                 f"You've successfully measured {self.goal_amount}L of water!\n\n"
                 f"Moves: {self.moves_count}\n"
-                f"Time: {elapsed_time // 60}m {elapsed_time % 60}s"
+                f"Litres poured: {self.litres_poured}L\n"
+                f"Time: {int(elapsed_time // 60)}m {elapsed_time % 60:.2f}s"
             )
             self.update_message(congrats_msg)
             messagebox.showinfo("Puzzle Solved!", "You've solved the Water Jug Challenge!")
         else:
             # Update message with the action performed
+            jug_lines = "".join(f"Jug {i + 1}: {amount}L / {capacity}L\n"
+                                for i, (amount, capacity) in enumerate(zip(self.current, self.capacities)))
             status_msg = (
                 f"Move #{self.moves_count}: {action_desc}\n\n"
                 f"Current state:\n"
-                f"Jug 1: {self.jug1_current}L / {self.jug1_capacity}L\n"
-                f"Jug 2: {self.jug2_current}L / {self.jug2_capacity}L\n\n"
+                f"{jug_lines}\n"
                 f"Goal: {self.goal_amount}L"
             )
             self.update_message(status_msg)
     
+    def compact_scores(self):
+        """Compact the score log if it has grown large or holds torn lines"""
+        log = self.score_log
+        # A log that could not be read in full must not be rewritten from what was read
+        if log.offsets is None or log.error is not None or not (log.records >= COMPACT_RECORDS or log.corrupt):
+            return
+        try:
+            log.compact(min_drop=COMPACT_MIN_DROP)
+        except OSError:
+            # The log is left exactly as it was; compaction can wait for the next run
+            pass
+    
     def on_close(self):
         """Handle window close event"""
         if self.game_active:
             if messagebox.askokcancel("Quit Game", "Do you want to quit the game?"):
                 self.stop_timer()
-                self.save_scores()
+                self.compact_scores()
                 self.root.destroy()
         else:
+            self.compact_scores()
             self.root.destroy()
 
 if __name__ == "__main__":
@@ -0,0 +1,131 @@
+# Water jug solver benchmark: times each solver on two-jug puzzles from 10L to
+# 10,000,000L jugs and reports states explored (generated, for the closed
+# form), peak memory and wall time.
+# Wall time comes from an untraced run and peak memory from a second run
+# under tracemalloc, which slows Python down too much to time alongside.
+#
+#   python water_jug_benchmark.py
+#   python water_jug_benchmark.py --sizes 10,1000,1000000 --solvers bfs,closed --json
+
+import sys
+import json
+import time
+import argparse
+import tracemalloc
+
+from water_jug_solver import (BFS_STATE_LIMIT, MOVES, LITRES, HintTable, JugSystem, bfs,
+                              closed_form_solution, dijkstra)
+
+DEFAULT_SIZES = [10 ** exponent for exponent in range(1, 8)]
+
+
+def puzzle_for_size(size):
+    """(size, size - 1) jugs with half of size as the goal
+
+    Each fill-and-pour cycle gains only one litre, so the optimal solution
+    takes about size moves and a search reaches most reachable states.
+    """
+    return (size, size - 1), size // 2
+
+
+def walk_closed_form(capacities, goal):
+    """Closed-form plan walked through to the goal, with explored set to the states it produced
+
+    closed_form_solution only costs the plan and generates states lazily, so
+    walking it here keeps its time comparable with the searches, which build
+    their whole path.
+    """
+    plan = closed_form_solution(capacities[0], capacities[1], goal)
+    if plan is not None:
+        plan.explored = sum(1 for _ in plan)
+    return plan
+
+
+# Solver name -> (most packed states it may allocate for, or None, and a
+# function of (capacities, goal) returning a result with explored and cost).
+# Dijkstra's bitmap needs a bit per state; BFS parents and hint tables need
+# nine bytes.
+SOLVERS = {
+    "bfs": (10 ** 7, lambda capacities, goal: bfs(JugSystem(capacities), goal)),
+    "dijkstra": (10 ** 9, lambda capacities, goal: dijkstra(JugSystem(capacities), goal)),
+    "hints": (BFS_STATE_LIMIT, lambda capacities, goal: HintTable(JugSystem(capacities), goal, MOVES)),
+    "hints-litres": (BFS_STATE_LIMIT, lambda capacities, goal: HintTable(JugSystem(capacities), goal, LITRES)),
+    "closed": (None, walk_closed_form),
+}
+
+
+def run_solver(name, capacities, goal):
+    """Solve once for time and once under tracemalloc; returns a result dict for the report"""
+    state_limit, solver = SOLVERS[name]
+    result = {"solver": name, "capacities": list(capacities), "goal": goal}
+    if state_limit is not None and JugSystem(capacities).state_count > state_limit:
+        result["skipped"] = f"more than {state_limit} states"
+        return result
+
+    start = time.perf_counter()
+    solution = solver(capacities, goal)
+    result["seconds"] = time.perf_counter() - start
+
+    tracemalloc.start()
+    try:
+        solver(capacities, goal)
+        result["peak_bytes"] = tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+    if isinstance(solution, HintTable):
+        result["explored"] = solution.explored
+        result["cost"] = solution.cost(0)
+    else:
+        result["explored"] = solution.explored if solution is not None else None
+        result["cost"] = solution.cost if solution is not None else None
+    return result
+
+
+def print_report(results):
+    print(f"{'capacities':<28}{'solver':<14}{'states':>12}{'cost':>10}{'peak KiB':>12}{'ms':>12}")
+    for result in results:
+        capacities = "/".join(map(str, result["capacities"])) + f" -> {result['goal']}"
+        if "skipped" in result:
+            print(f"{capacities:<28}{result['solver']:<14}  skipped: {result['skipped']}")
+            continue
+        print(f"{capacities:<28}{result['solver']:<14}"
+              f"{result['explored']:>12}"
+              f"{result['cost'] if result['cost'] is not None else '-':>10}"
+              f"{result['peak_bytes'] / 1024:>12.1f}"
+              f"{result['seconds'] * 1000:>12.2f}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Time the water jug solvers across jug sizes")
+    parser.add_argument("--sizes", default=",".join(map(str, DEFAULT_SIZES)),
+                        help="comma-separated capacities of the larger jug (default: 10 to 10000000)")
+    parser.add_argument("--solvers", default=",".join(SOLVERS),
+                        help=f"comma-separated solvers to run: {', '.join(SOLVERS)}")
+    parser.add_argument("--json", action="store_true", help="print the results as JSON")
+    args = parser.parse_args()
+
+    try:
+        sizes = [int(size) for size in args.sizes.split(",")]
+    except ValueError:
+        parser.error(f"invalid --sizes {args.sizes!r}")
+    names = args.solvers.split(",")
+    for name in names:
+        if name not in SOLVERS:
+            parser.error(f"unknown solver {name!r}, expected one of {', '.join(SOLVERS)}")
+
+    results = []
+    for size in sizes:
+        capacities, goal = puzzle_for_size(size)
+        for name in names:
+            results.append(run_solver(name, capacities, goal))
+
+    if args.json:
+        json.dump(results, sys.stdout, indent=2)
+        print()
+    else:
+        print_report(results)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,675 @@
+# Rules and solvers for the water jug puzzle with any number of jugs: the
+# transition function, BFS, Dijkstra, the two-jug closed form, hint tables and
+# move descriptions. Kept free of tkinter so puzzles can be solved and timed
+# without a window; see water_jug_benchmark.py.
+
+import os
+import math
+import heapq
+import struct
+import random
+import argparse
+import itertools
+from array import array
+from collections import deque
+from multiprocessing import Pool
+
+FILL = "fill"
+EMPTY = "empty"
+POUR = "pour"
+
+# Cost modes: every action costs one move, or the litres of water it moves
+MOVES = "moves"
+LITRES = "litres"
+
+# Most packed states solve() will search. Larger two-jug move-count puzzles
+# are solved with the closed form below, which needs no per-state memory at
+# all; any other puzzle that large is refused.
+BFS_STATE_LIMIT = 1_000_000
+
+
+class JugSystem:
+    """Jug capacities, with states packed into one integer
+
+    The amount in jug i is the i-th digit of the state in a mixed radix whose
+    i-th base is capacities[i] + 1, so states index a dense bitmap directly.
+    """
+
+    def __init__(self, capacities):
+        self.capacities = tuple(capacities)
+        self.radices = []
+        radix = 1
+        for capacity in self.capacities:
+            self.radices.append(radix)
+            radix *= capacity + 1
+        self.state_count = radix
+
+        # Fills, then empties, then pours in (source, target) order
+        self.actions = [(FILL, i, None) for i in range(len(self.capacities))]
+        self.actions += [(EMPTY, i, None) for i in range(len(self.capacities))]
+        self.actions += [(POUR, i, j) for i in range(len(self.capacities))
+                         for j in range(len(self.capacities)) if i != j]
+
+    def pack(self, amounts):
+        return sum(amount * radix for amount, radix in zip(amounts, self.radices))
+
+    def unpack(self, state):
+        amounts = []
+        for capacity in self.capacities:
+            state, amount = divmod(state, capacity + 1)
+            amounts.append(amount)
+        return tuple(amounts)
+
+    def apply(self, state, action):
+        """(next state, litres moved) for action, or None if it changes nothing"""
+        kind, source, target = action
+        amount = state // self.radices[source] % (self.capacities[source] + 1)
+        if kind == FILL:
+            litres = self.capacities[source] - amount
+            if not litres:
+                return None
+            return state + litres * self.radices[source], litres
+        if kind == EMPTY:
+            if not amount:
+                return None
+            return state - amount * self.radices[source], amount
+        space = self.capacities[target] - state // self.radices[target] % (self.capacities[target] + 1)
+        litres = min(amount, space)
+        if not litres:
+            return None
+        return state - litres * self.radices[source] + litres * self.radices[target], litres
+
+    def successors(self, state):
+        """(action, next state, litres moved) for every action that changes state"""
+        for action in self.actions:
+            result = self.apply(state, action)
+            if result is not None:
+                yield action, result[0], result[1]
+
+    def predecessors(self, state):
+        """(action, previous state, litres moved) for every action that leads to state"""
+        amounts = self.unpack(state)
+        for action in self.actions:
+            kind, source, target = action
+            amount = amounts[source]
+            radix = self.radices[source]
+            if kind == FILL:
+                if amount == self.capacities[source]:
+                    for before in range(amount):
+                        yield action, state - (amount - before) * radix, amount - before
+            elif kind == EMPTY:
+                if amount == 0:
+                    for before in range(1, self.capacities[source] + 1):
+                        yield action, state + before * radix, before
+            elif amount == 0 or amounts[target] == self.capacities[target]:
+                # A pour stops when the source runs dry or the target is full,
+                # and it moved up to what the target holds now
+                step = radix - self.radices[target]
+                for litres in range(1, min(amounts[target], self.capacities[source] - amount) + 1):
+                    yield action, state + litres * step, litres
+
+    def holds(self, state, goal):
+        """Whether any jug holds exactly goal litres"""
+        for capacity in self.capacities:
+            state, amount = divmod(state, capacity + 1)
+            if amount == goal:
+                return True
+        return False
+
+
+class Solution:
+    """States from all-empty to the goal, the actions between them and the total cost
+
+    explored is the number of states the search reached on the way.
+    """
+
+    def __init__(self, states, actions, cost, explored=0):
+        self.states = states
+        self.actions = actions
+        self.cost = cost
+        self.explored = explored
+
+    def __len__(self):
+        return len(self.states)
+
+
+def is_solvable(capacities, goal):
+    """Goal must be at least zero, fit in the largest jug and be a multiple of the capacities' gcd"""
+    return 0 <= goal <= max(capacities) and goal % math.gcd(*capacities) == 0
+
+
+def can_solve(capacities, mode=MOVES):
+    """Whether solve() takes the puzzle: few enough states to search, or two jugs scored by moves"""
+    if mode == MOVES and len(capacities) == 2:
+        return True
+    return math.prod(capacity + 1 for capacity in capacities) <= BFS_STATE_LIMIT
+
+
+def _path(system, parents, goal_state):
+    """States and actions from the start to goal_state, following parents back"""
+    states = [system.unpack(goal_state)]
+    actions = []
+    state = goal_state
+    while state in parents:
+        state, action = parents[state]
+        actions.append(action)
+        states.append(system.unpack(state))
+    states.reverse()
+    actions.reverse()
+    return states, actions
+
+
+def bfs(system, goal, start=0):
+    """Fewest-moves Solution, or None if no jug can be made to hold goal
+
+    Each packed state indexes a flat parent array holding the state it was
+    first reached from (-1 while unvisited) and a byte array holding the
+    action taken, so states are marked on enqueue and the path is only
+    rebuilt once at the end. That is nine bytes for every state of the
+    puzzle, which solve() keeps to BFS_STATE_LIMIT states.
+    """
+    parents = array("q", [-1]) * system.state_count
+    parent_actions = bytearray(system.state_count)
+    parents[start] = start
+    explored = 1
+    goal_state = start if system.holds(start, goal) else None
+    queue = deque([start])
+
+    while queue and goal_state is None:
+        state = queue.popleft()
+        for index, action in enumerate(system.actions):
+            result = system.apply(state, action)
+            if result is None or parents[result[0]] != -1:
+                continue
+            next_state = result[0]
+            parents[next_state] = state
+            parent_actions[next_state] = index
+            explored += 1
+            if system.holds(next_state, goal):
+                goal_state = next_state
+                break
+            queue.append(next_state)
+    if goal_state is None:
+        return None
+
+    # Follow the parent links back to the start
+    states = [system.unpack(goal_state)]
+    actions = []
+    state = goal_state
+    while state != start:
+        actions.append(system.actions[parent_actions[state]])
+        state = parents[state]
+        states.append(system.unpack(state))
+    states.reverse()
+    actions.reverse()
+    return Solution(states, actions, len(actions), explored)
+
+
+def dijkstra(system, goal, start=0):
+    """Solution moving the fewest litres of water, or None if goal cannot be measured
+
+    A* with the heuristic "some jug must still change by at least
+    min |amount - goal| litres", which never overestimates because an action
+    moving L litres changes each jug by at most L.
+    """
+    def heuristic(state):
+        return min(abs(amount - goal) for amount in system.unpack(state))
+
+    settled = bytearray((system.state_count + 7) // 8)
+    costs = {start: 0}
+    parents = {}
+    heap = [(heuristic(start), 0, start)]
+    while heap:
+        _, cost, state = heapq.heappop(heap)
+        byte, bit = state >> 3, 1 << (state & 7)
+        if settled[byte] & bit:
+            continue
+        settled[byte] |= bit
+        if system.holds(state, goal):
+            states, actions = _path(system, parents, state)
+            return Solution(states, actions, cost, len(costs))
+        for action, next_state, litres in system.successors(state):
+            next_cost = cost + litres
+            if next_cost < costs.get(next_state, next_cost + 1):
+                costs[next_state] = next_cost
+                parents[next_state] = (state, action)
+                heapq.heappush(heap, (next_cost + heuristic(next_state), next_cost, next_state))
+    return None
+
+
+def solve(capacities, goal, mode=MOVES):
+    """Optimal solution for the puzzle under the cost mode, or None if unsolvable
+
+    Two-jug move-count puzzles too large to search use the closed form and
+    return a PouringPlan, which has the same states sequence interface.
+    Raises ValueError for any other puzzle above BFS_STATE_LIMIT states;
+    check can_solve first.
+    """
+    if not is_solvable(capacities, goal):
+        return None
+    if not can_solve(capacities, mode):
+        raise ValueError(f"jugs {capacities} have too many states to search")
+    system = JugSystem(capacities)
+    if system.state_count > BFS_STATE_LIMIT:
+        return closed_form_solution(capacities[0], capacities[1], goal)
+    if mode == LITRES:
+        return dijkstra(system, goal)
+    return bfs(system, goal)
+
+
+# Marks a state with no next action in a HintTable: a goal, or unsolvable
+NO_ACTION = 255
+
+
+class HintTable:
+    """Cost to the goal and best next action from every state of a puzzle
+
+    Built once by searching backwards from all goal states at the same time,
+    BFS for moves and Dijkstra for litres, so a hint from any state the
+    player can reach is an array lookup. Costs are -1 for states that cannot
+    reach the goal.
+    """
+
+    def __init__(self, system, goal, mode=MOVES):
+        self.system = system
+        self.goal = goal
+        self.mode = mode
+        self.costs = array("q", [-1]) * system.state_count
+        self.next_actions = bytearray([NO_ACTION]) * system.state_count
+        self.action_index = {action: i for i, action in enumerate(system.actions)}
+        self.explored = 0
+        if mode == LITRES:
+            self._dijkstra()
+        else:
+            self._bfs()
+
+    def goal_states(self):
+        """Every state with some jug holding exactly the goal"""
+        capacities = self.system.capacities
+        for jug, capacity in enumerate(capacities):
+            if not 0 <= self.goal <= capacity:
+                continue
+            ranges = [(self.goal,) if i == jug else range(c + 1) for i, c in enumerate(capacities)]
+            for amounts in itertools.product(*ranges):
+                yield self.system.pack(amounts)
+
+    def _bfs(self):
+        costs, next_actions = self.costs, self.next_actions
+        frontier = []
+        for state in self.goal_states():
+            if costs[state] < 0:
+                costs[state] = 0
+                frontier.append(state)
+        cost = 0
+        while frontier:
+            cost += 1
+            next_frontier = []
+            for state in frontier:
+                for action, previous, _ in self.system.predecessors(state):
+                    if costs[previous] < 0:
+                        costs[previous] = cost
+                        next_actions[previous] = self.action_index[action]
+                        next_frontier.append(previous)
+            self.explored += len(frontier)
+            frontier = next_frontier
+
+    def _dijkstra(self):
+        costs, next_actions = self.costs, self.next_actions
+        heap = []
+        for state in self.goal_states():
+            if costs[state] < 0:
+                costs[state] = 0
+                heap.append((0, state))
+        heapq.heapify(heap)
+        while heap:
+            cost, state = heapq.heappop(heap)
+            if cost > costs[state]:
+                continue
+            self.explored += 1
+            for action, previous, litres in self.system.predecessors(state):
+                previous_cost = cost + litres
+                if costs[previous] < 0 or previous_cost < costs[previous]:
+                    costs[previous] = previous_cost
+                    next_actions[previous] = self.action_index[action]
+                    heapq.heappush(heap, (previous_cost, previous))
+
+    def cost(self, state):
+        """Moves or litres still needed from a packed state, or None if it cannot reach the goal"""
+        cost = self.costs[state]
+        return cost if cost >= 0 else None
+
+    def next_action(self, state):
+        """Best action from a packed state, or None at a goal or a dead end"""
+        index = self.next_actions[state]
+        return self.system.actions[index] if index != NO_ACTION else None
+
+    def solution(self, start=0):
+        """Solution following the best actions from start, or None if it cannot reach the goal"""
+        if self.costs[start] < 0:
+            return None
+        states = [self.system.unpack(start)]
+        actions = []
+        state = start
+        action = self.next_action(state)
+        while action is not None:
+            state = self.system.apply(state, action)[0]
+            states.append(self.system.unpack(state))
+            actions.append(action)
+            action = self.next_action(state)
+        return Solution(states, actions, self.costs[start], self.explored)
+
+
+def describe_action(capacities, action, litres):
+    """What an action just did, given the litres it moved"""
+    kind, source, target = action
+    if kind == FILL:
+        return f"Filled Jug {source + 1} to capacity ({capacities[source]}L)"
+    if kind == EMPTY:
+        return f"Emptied Jug {source + 1}"
+    return f"Poured {litres}L from Jug {source + 1} to Jug {target + 1}"
+
+
+def describe_move(capacities, current, next_state):
+    """Description of the single action that turns current into next_state"""
+    changed = [i for i, (a, b) in enumerate(zip(current, next_state)) if a != b]
+    if len(changed) == 1:
+        jug = changed[0]
+        if next_state[jug] == capacities[jug]:
+            return f"Fill the {capacities[jug]}L jug completely"
+        if next_state[jug] == 0:
+            return f"Empty jug {jug + 1}"
+    elif len(changed) == 2:
+        first, second = changed
+        source, target = (first, second) if next_state[first] < current[first] else (second, first)
+        return f"Pour water from jug {source + 1} into jug {target + 1}"
+    return "Move to the next state in the solution"
+
+
+def litres_moved(current, next_state):
+    """Litres a single action moved between two states"""
+    return max(abs(a - b) for a, b in zip(current, next_state))
+
+
+def extended_gcd(a, b):
+    """(g, s, t) with a*s + b*t == g == gcd(a, b)"""
+    old_r, r = a, b
+    old_s, s = 1, 0
+    old_t, t = 0, 1
+    while r:
+        q = old_r // r
+        old_r, r = r, old_r - q * r
+        old_s, s = s, old_s - q * s
+        old_t, t = t, old_t - q * t
+    return old_r, old_s, old_t
+
+
+def strategy_moves(source, target, goal):
+    """Moves taken by "fill source, pour into target, empty target when full"
+
+    Filling source k times and emptying target j times leaves
+    k*source - j*target litres in the jugs, so the goal first appears at the
+    smallest k, j solving k*source - j*target == goal, found from the
+    extended Euclidean coefficients. Returns None if this strategy never
+    leaves goal in either jug.
+    """
+    g, s, t = extended_gcd(source, target)
+    source_g, target_g, goal_g = source // g, target // g, goal // g
+    best = None
+    # Target holds the goal right after a pour empties source: k fills,
+    # k + j pours and j empties
+    if goal < target:
+        k = goal_g * s % target_g or target_g
+        j = (k * source - goal) // target
+        best = 2 * (k + j)
+    # Source holds the goal right after a pour fills target: the last pour does
+    # not empty source and the full target is not emptied
+    if goal < source:
+        j = -goal_g * t % source_g or source_g
+        k = (j * target + goal) // source
+        moves = 2 * (k + j) - 2
+        best = moves if best is None else min(best, moves)
+    return best
+
+
+class PouringPlan:
+    """Optimal two-jug solution from the closed form, generated on demand
+
+    Acts like the list of (jug1, jug2) states from (0, 0) to the goal but
+    only keeps the state last asked for and the one before it, so walking it
+    in order, even looking one step back, costs O(1) per step and no memory
+    per state.
+    """
+
+    def __init__(self, jug1_capacity, jug2_capacity, goal, source_is_jug1, moves):
+        self.jug1_capacity = jug1_capacity
+        self.jug2_capacity = jug2_capacity
+        self.goal = goal
+        self.source_is_jug1 = source_is_jug1
+        self.moves = moves
+        self.cost = moves
+        self.explored = 0
+        self.cursor = 0
+        self.state = (0, 0)
+        self.previous = None
+
+    @property
+    def states(self):
+        return self
+
+    def __len__(self):
+        return self.moves + 1
+
+    def __iter__(self):
+        state = (0, 0)
+        yield state
+        for _ in range(self.moves):
+            state = self.step(state)
+            yield state
+
+    def __getitem__(self, index):
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("plan index out of range")
+        if index == self.cursor - 1:
+            return self.previous
+        if index < self.cursor:
+            self.cursor, self.state, self.previous = 0, (0, 0), None
+        while self.cursor < index:
+            self.previous, self.state = self.state, self.step(self.state)
+            self.cursor += 1
+        return self.state
+
+    def index(self, state):
+        for i, plan_state in enumerate(self):
+            if plan_state == state:
+                return i
+        raise ValueError(f"{state} is not in the plan")
+
+    def step(self, state):
+        """Next state: empty the target when full, else refill an empty source, else pour"""
+        if self.source_is_jug1:
+            source, target = state
+            source_capacity, target_capacity = self.jug1_capacity, self.jug2_capacity
+        else:
+            target, source = state
+            source_capacity, target_capacity = self.jug2_capacity, self.jug1_capacity
+
+        if target == target_capacity:
+            target = 0
+        elif source == 0:
+            source = source_capacity
+        else:
+            amount = min(source, target_capacity - target)
+            source -= amount
+            target += amount
+        return (source, target) if self.source_is_jug1 else (target, source)
+
+
+def closed_form_solution(jug1_capacity, jug2_capacity, goal):
+    """Shortest solution as a PouringPlan, or None if goal cannot be measured
+
+    Both pouring directions are costed with strategy_moves and the cheaper
+    one is kept; this matches the BFS optimum for every solvable puzzle.
+    """
+    if not is_solvable((jug1_capacity, jug2_capacity), goal):
+        return None
+    if goal == 0:
+        return PouringPlan(jug1_capacity, jug2_capacity, goal, True, 0)
+    if goal in (jug1_capacity, jug2_capacity):
+        # A single fill
+        return PouringPlan(jug1_capacity, jug2_capacity, goal, goal == jug1_capacity, 1)
+
+    options = [
+        (moves, source_is_jug1)
+        for moves, source_is_jug1 in ((strategy_moves(jug1_capacity, jug2_capacity, goal), True),
+                                      (strategy_moves(jug2_capacity, jug1_capacity, goal), False))
+        if moves is not None
+    ]
+    moves, source_is_jug1 = min(options, key=lambda option: option[0])
+    return PouringPlan(jug1_capacity, jug2_capacity, goal, source_is_jug1, moves)
+
+
+def goal_distances(system):
+    """Fewest moves until some jug holds each amount, for every amount at once
+
+    One BFS from all-empty serves every goal: an amount's distance is the
+    first layer in which any jug holds it. Amounts never reached are -1.
+    """
+    distances = [-1] * (max(system.capacities) + 1)
+    distances[0] = 0
+    visited = bytearray((system.state_count + 7) // 8)
+    visited[0] |= 1
+    frontier = [0]
+    moves = 0
+    while frontier:
+        moves += 1
+        next_frontier = []
+        for state in frontier:
+            for _, next_state, _ in system.successors(state):
+                byte, bit = next_state >> 3, 1 << (next_state & 7)
+                if visited[byte] & bit:
+                    continue
+                visited[byte] |= bit
+                next_frontier.append(next_state)
+                for amount in system.unpack(next_state):
+                    if distances[amount] < 0:
+                        distances[amount] = moves
+        frontier = next_frontier
+    return distances
+
+
+# Puzzle catalogue: every two-jug puzzle up to a capacity bound, sorted by its
+# optimal move count. After the magic come the capacity bound and the largest
+# move count M as uint16, then M + 2 uint32 offsets where offsets[m] is the
+# number of puzzles solved in fewer than m moves, then one (jug1, jug2, goal)
+# uint16 record per puzzle.
+CATALOGUE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "water_jug_catalogue.bin")
+CATALOGUE_MAGIC = b"WJC1"
+CATALOGUE_HEADER = struct.Struct("<HH")
+CATALOGUE_RECORD = struct.Struct("<HHH")
+CATALOGUE_MAX_CAPACITY = 40
+
+
+def _pair_goal_distances(pair):
+    return pair, goal_distances(JugSystem(pair))
+
+
+def build_catalogue(max_capacity=CATALOGUE_MAX_CAPACITY, path=CATALOGUE_FILE, workers=None):
+    """Solve every puzzle with jug1 > jug2 up to max_capacity and write the catalogue to path
+
+    Each capacity pair is searched once for all of its goals, and pairs are
+    spread over a process pool. Goals needing fewer than two moves are left
+    out. Returns the number of puzzles written.
+    """
+    pairs = [(jug1, jug2) for jug1 in range(2, max_capacity + 1) for jug2 in range(1, jug1)]
+    puzzles = []
+    with Pool(workers) as pool:
+        for pair, distances in pool.imap_unordered(_pair_goal_distances, pairs, chunksize=max(1, len(pairs) // 64)):
+            for goal, moves in enumerate(distances):
+                if moves >= 2:
+                    puzzles.append((moves, pair[0], pair[1], goal))
+    puzzles.sort()
+
+    max_moves = puzzles[-1][0] if puzzles else 0
+    offsets = [0] * (max_moves + 2)
+    for moves, _, _, _ in puzzles:
+        offsets[moves + 1] += 1
+    for moves in range(1, len(offsets)):
+        offsets[moves] += offsets[moves - 1]
+
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(CATALOGUE_MAGIC)
+        f.write(CATALOGUE_HEADER.pack(max_capacity, max_moves))
+        f.write(struct.pack(f"<{len(offsets)}I", *offsets))
+        for _, jug1, jug2, goal in puzzles:
+            f.write(CATALOGUE_RECORD.pack(jug1, jug2, goal))
+    os.replace(tmp_path, path)
+    return len(puzzles)
+
+
+class PuzzleCatalogue:
+    """Two-jug puzzles sorted by optimal move count, loaded from the catalogue file"""
+
+    def __init__(self, data, max_capacity, max_moves, offsets, records_start):
+        self.data = data
+        self.max_capacity = max_capacity
+        self.max_moves = max_moves
+        self.offsets = offsets
+        self.records_start = records_start
+
+    @classmethod
+    def load(cls, path=CATALOGUE_FILE):
+        """Return the catalogue stored at path, or None if it is missing or malformed"""
+        try:
+            with open(path, "rb") as f:
+                data = f.read()
+        except OSError:
+            return None
+        header_end = len(CATALOGUE_MAGIC) + CATALOGUE_HEADER.size
+        if not data.startswith(CATALOGUE_MAGIC) or len(data) < header_end:
+            return None
+        max_capacity, max_moves = CATALOGUE_HEADER.unpack_from(data, len(CATALOGUE_MAGIC))
+        records_start = header_end + 4 * (max_moves + 2)
+        if len(data) < records_start:
+            return None
+        offsets = struct.unpack_from(f"<{max_moves + 2}I", data, header_end)
+        if len(data) != records_start + offsets[-1] * CATALOGUE_RECORD.size:
+            return None
+        return cls(data, max_capacity, max_moves, offsets, records_start)
+
+    def __len__(self):
+        return self.offsets[-1]
+
+    def band(self, min_moves, max_moves):
+        """(start, stop) record indexes of the puzzles solved in min_moves to max_moves moves"""
+        last = self.max_moves + 1
+        return self.offsets[min(min_moves, last)], self.offsets[min(max_moves + 1, last)]
+
+    def puzzle(self, index):
+        """((jug1, jug2), goal) of the record at index"""
+        jug1, jug2, goal = CATALOGUE_RECORD.unpack_from(self.data, self.records_start + index * CATALOGUE_RECORD.size)
+        return (jug1, jug2), goal
+
+    def pick(self, min_moves, max_moves, rng=random):
+        """A random puzzle solved in min_moves to max_moves moves, or None if there are none"""
+        start, stop = self.band(min_moves, max_moves)
+        if start == stop:
+            return None
+        return self.puzzle(rng.randrange(start, stop))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Water jug solver tools")
+    parser.add_argument("--build-catalogue", nargs="?", const=CATALOGUE_FILE, metavar="FILE",
+                        help=f"solve every two-jug puzzle and write the catalogue (default: {CATALOGUE_FILE})")
+    parser.add_argument("--max-capacity", type=int, default=CATALOGUE_MAX_CAPACITY,
+                        help=f"largest jug in the catalogue (default: {CATALOGUE_MAX_CAPACITY})")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: CPU count)")
+    args = parser.parse_args()
+    if args.build_catalogue:
+        count = build_catalogue(args.max_capacity, args.build_catalogue, args.workers)
+        print(f"Catalogued {count} puzzles into {args.build_catalogue}")
+    else:
+        parser.print_help()